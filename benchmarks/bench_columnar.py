@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Compare file size and load time of the CSV, SQCOL and Parquet outputs.
+
+Usage:
+    python benchmarks/bench_columnar.py [--rows 200000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from seqno_checker.output import _load_pyarrow, read_columnar, read_csv, write_columnar, write_csv
+from seqno_checker.records import TxRecord
+
+STATUSES = ("Completed", "Safe to fail", "Unknown")
+
+
+def make_records(rows: int, seed: int = 11):
+    rnd = random.Random(seed)
+    return [
+        TxRecord(
+            100000 + i // 4,
+            rnd.getrandbits(128),
+            400000 + rnd.randrange(200),
+            STATUSES[rnd.randrange(3)],
+        )
+        for i in range(rows)
+    ]
+
+
+def best_of(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = make_records(args.rows)
+    pa = _load_pyarrow()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            "csv": os.path.join(tmp, "out.csv"),
+            "sqcol": os.path.join(tmp, "out.sqcol"),
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_csv(records, paths["csv"])
+            write_columnar(records, paths["sqcol"], fmt="sqcol")
+            if pa is not None:
+                paths["parquet"] = os.path.join(tmp, "out.parquet")
+                write_columnar(records, paths["parquet"], fmt="parquet")
+
+        loaders = {
+            "csv": lambda: read_csv(paths["csv"]),
+            "sqcol": lambda: read_columnar(paths["sqcol"]),
+        }
+        if pa is not None:
+            loaders["parquet"] = lambda: read_columnar(paths["parquet"])
+            # What an analytics tool sees: the Arrow table, no Python objects
+            loaders["parquet (arrow only)"] = lambda: pa.parquet.read_table(paths["parquet"])
+
+        csv_size = os.path.getsize(paths["csv"])
+        print(f"rows={args.rows}")
+        print(f"{'format':<22} {'size KiB':>10} {'vs csv':>7} {'load ms':>10}")
+        csv_load = None
+        for name, loader in loaders.items():
+            size = os.path.getsize(paths[name.split()[0]])
+            load_t, loaded = best_of(loader, args.repeat)
+            if csv_load is None:
+                csv_load = load_t
+            if isinstance(loaded, list) and loaded != records:
+                print(f"{name}: loaded records differ from the originals")
+                sys.exit(1)
+            print(f"{name:<22} {size / 1024:>10.0f} {size / csv_size:>6.0%} {load_t * 1000:>10.1f}"
+                  f"  ({csv_load / load_t:.1f}x)")
+        if pa is None:
+            print("pyarrow is not installed; Parquet was skipped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark the extraction hot paths and the CSV status update on synthetic
+corpora, and compare against a saved JSON baseline.
+
+Throughput is the best of --repeat runs; memory is the tracemalloc peak of a
+separate run. With --baseline, the run fails (exit status 1) when a case's
+throughput drops by more than --threshold, or its peak memory grows by more
+than --memory-threshold. Cases that take under --min-ms in the baseline or now
+are too short to time reliably, so their slowdowns are only reported.
+
+Throughput depends on the machine, so no baseline is kept in the repository.
+CI saves one from the target branch and compares the change against it, in
+the same job on the same runner:
+    git worktree add /tmp/bench-base origin/main
+    python /tmp/bench-base/benchmarks/bench_extract.py --save /tmp/extract_baseline.json
+    python benchmarks/bench_extract.py --baseline /tmp/extract_baseline.json
+
+Usage:
+    python benchmarks/bench_extract.py --save extract_baseline.json
+    python benchmarks/bench_extract.py --baseline extract_baseline.json [--threshold 0.4]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from seqno_checker.corpus import generate_logs
+from seqno_checker.extract import (
+    extract_completed_txids, extract_json_after_label_from_text, extract_message_field, extract_pairs_seqno_txid,
+    extract_seqnos_from_logs, extract_source_ids,
+)
+from seqno_checker.output import atomic_write, write_csv
+from seqno_checker.status import update_csv_with_status
+
+
+def make_inputs(records: int, seed: int):
+    """Logs split the way the stages see them: enrichment logs and COMPLETED logs."""
+    logs = list(generate_logs(records, seed=seed))
+    completed_logs = [lg for lg in logs if "COMPLETED" in (extract_message_field(lg) or "")]
+    completed_ids = {id(lg) for lg in completed_logs}
+    enrichment_logs = [lg for lg in logs if id(lg) not in completed_ids]
+    messages = [extract_message_field(lg) or "" for lg in enrichment_logs]
+    return enrichment_logs, completed_logs, messages
+
+
+def make_cases(records: int, seed: int, tmp: str):
+    enrichment_logs, completed_logs, messages = make_inputs(records, seed)
+    pairs = extract_pairs_seqno_txid(enrichment_logs)
+    completed = extract_completed_txids(completed_logs)
+    mapping = extract_source_ids(enrichment_logs)
+    csv_path = os.path.join(tmp, f"bench_{records}.csv")
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_csv(pairs, csv_path)
+
+    def status_update():
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_csv_with_status(csv_path, completed, mapping)
+
+    # name -> (fn, items processed per call)
+    return {
+        "extract_message_field": (lambda: [extract_message_field(lg) for lg in enrichment_logs], len(enrichment_logs)),
+        "extract_json_after_label_from_text": (
+            lambda: [extract_json_after_label_from_text(m) for m in messages], len(messages),
+        ),
+        "extract_seqnos_from_logs": (lambda: extract_seqnos_from_logs(enrichment_logs), len(enrichment_logs)),
+        "extract_pairs_seqno_txid": (lambda: extract_pairs_seqno_txid(enrichment_logs), len(enrichment_logs)),
+        "extract_completed_txids": (lambda: extract_completed_txids(completed_logs), len(completed_logs)),
+        "extract_source_ids": (lambda: extract_source_ids(enrichment_logs), len(enrichment_logs)),
+        "update_csv_with_status": (status_update, len(pairs)),
+    }
+
+
+def best_time(fn, repeat: int) -> float:
+    # Like timeit, keep collector pauses out of the timings
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def peak_memory(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare(results: dict, baseline: dict, threshold: float, memory_threshold: float,
+            min_sec: float) -> tuple:
+    """Returns (failures, notes); slowdowns of cases shorter than min_sec are notes."""
+    failures, notes = [], []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        slower = 1 - cur["items_per_sec"] / base["items_per_sec"]
+        bigger = cur["peak_bytes"] / base["peak_bytes"] - 1 if base["peak_bytes"] else 0.0
+        if slower > threshold:
+            message = (f"{key}: throughput {cur['items_per_sec']:.0f}/s is {slower:.0%} below "
+                       f"the baseline {base['items_per_sec']:.0f}/s")
+            if min(cur["best_sec"], base["best_sec"]) < min_sec:
+                notes.append(f"{message} (under {min_sec * 1000:.0f} ms, not counted)")
+            else:
+                failures.append(message)
+        if bigger > memory_threshold:
+            failures.append(f"{key}: peak memory {cur['peak_bytes'] / 1024:.0f} KiB is {bigger:.0%} above "
+                            f"the baseline {base['peak_bytes'] / 1024:.0f} KiB")
+    return failures, notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="transactions per corpus")
+    parser.add_argument("--repeat", type=int, default=15, help="timed runs per case, best kept (default: 15)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--save", metavar="PATH", help="write the results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.4,
+                        help="allowed throughput drop vs the baseline (default: 0.4)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="allowed peak memory growth vs the baseline (default: 0.25)")
+    parser.add_argument("--min-ms", type=float, default=20.0,
+                        help="cases faster than this are timed but never fail (default: 20)")
+    args = parser.parse_args()
+    only = set(args.only.split(",")) if args.only else None
+    if args.baseline and args.repeat < 10:
+        print(f"Warning: best of {args.repeat} runs is noisy; use --repeat 10 or more when comparing.")
+
+    results = {}
+    print(f"{'benchmark':<36} {'size':>8} {'items/s':>12} {'best ms':>10} {'peak KiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(x) for x in args.sizes.split(",")):
+            for name, (fn, items) in make_cases(size, args.seed, tmp).items():
+                if only and name not in only:
+                    continue
+                fn()  # warm-up
+                elapsed = best_time(fn, args.repeat)
+                peak = peak_memory(fn)
+                key = f"{name}@{size}"
+                results[key] = {"items": items, "best_sec": elapsed,
+                                "items_per_sec": items / elapsed, "peak_bytes": peak}
+                print(f"{name:<36} {size:>8} {items / elapsed:>12.0f} {elapsed * 1000:>10.1f} {peak / 1024:>10.0f}")
+
+    if args.save:
+        with atomic_write(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results},
+                      f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        failures, notes = compare(results, baseline, args.threshold, args.memory_threshold, args.min_ms / 1000)
+        for note in notes:
+            print(f"  note {note}")
+        if failures:
+            print(f"\n{len(failures)} regression(s) beyond {args.threshold:.0%} throughput "
+                  f"/ {args.memory_threshold:.0%} memory:")
+            for failure in failures:
+                print(f"  FAIL {failure}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} throughput / {args.memory_threshold:.0%} memory "
+              f"against {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure how long `import seqno_checker` takes in a fresh interpreter and fail
+if it is over budget or pulls in modules that should only load on use.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 7] [--max-ms 60]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Loaded on first use only: the HTTP client, .env support, and the optional
+# NumPy/pyarrow paths. None of them may be imported by the package import.
+LAZY_MODULES = ("requests", "dotenv", "numpy", "pyarrow", "sqlite3", "http.server", "concurrent.futures")
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import seqno_checker
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def probe() -> dict:
+    # -I keeps site-packages .pth hooks and the user's environment out of the measurement
+    out = subprocess.run(
+        [sys.executable, "-I", "-c", f"import sys; sys.path.insert(0, {ROOT!r})\n{PROBE}"],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=60.0,
+                        help="fail when the fastest import takes longer than this (default: 60)")
+    args = parser.parse_args()
+
+    probe()  # warm-up: writes the .pyc files so every measured run starts the same way
+    runs = [probe() for _ in range(args.repeat)]
+    times = sorted(r["ms"] for r in runs)
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+    print(f"import seqno_checker: best {times[0]:.1f} ms, median {times[len(times) // 2]:.1f} ms "
+          f"over {args.repeat} runs (budget {args.max_ms:g} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: imported eagerly: {', '.join(loaded)}")
+        failed = True
+    if times[0] > args.max_ms:
+        print(f"FAIL: import took {times[0]:.1f} ms, over the {args.max_ms:g} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compare the memory held by result rows as CSV-style dicts (what the
+pipeline passed around before TxRecord) and as TxRecords, on a synthetic
+corpus's transactions.
+
+Two cases, each measured with tracemalloc (retained after the call, and peak):
+    held  the rows between stages: dicts keyed by the CSV column names
+          against TxRecords with encoded txIds and sourceIds
+    read  loading the results CSV: csv.DictReader rows against read_csv()
+
+Usage:
+    python benchmarks/bench_records.py [--records 100000] [--seed 1]
+"""
+import argparse
+import contextlib
+import csv
+import gc
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from seqno_checker.corpus import generate_logs
+from seqno_checker.ids import encode_source_id, encode_txid
+from seqno_checker.output import read_csv, write_csv
+from seqno_checker.records import TxRecord, record_from_row, record_to_row
+from seqno_checker.status import apply_status
+
+
+def make_records(records: int, seed: int):
+    truth = []
+    for _ in generate_logs(records, seed=seed, truth=truth):
+        pass
+    recs = [TxRecord(seq, encode_txid(tx)) for tx, seq, _, _, _ in truth]
+    apply_status(recs, [tx for tx, *_, done in truth if done],
+                 {encode_txid(tx): encode_source_id(src) for tx, _, src, _, _ in truth})
+    return recs
+
+
+def measure(fn):
+    """(result, bytes retained by the result, peak bytes while building it)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current - before, peak - before
+
+
+def read_dict_rows(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def report(name, n, dicts, records):
+    (_, d_kept, d_peak), (_, r_kept, r_peak) = dicts, records
+    print(f"  {name:<5} dicts:     {d_kept / 2**20:8.1f} MiB held ({d_kept / n:5.0f} B/row), "
+          f"peak {d_peak / 2**20:8.1f} MiB")
+    print(f"  {name:<5} TxRecords: {r_kept / 2**20:8.1f} MiB held ({r_kept / n:5.0f} B/row), "
+          f"peak {r_peak / 2**20:8.1f} MiB  ({d_kept / r_kept:.1f}x less held)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000, help="transactions in the corpus (default: 100000)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    recs = make_records(args.records, args.seed)
+    n = len(recs)
+    print(f"records={n}")
+
+    # record_to_row and record_from_row build fresh strings and ints, so
+    # neither side shares its values with the other
+    held_dicts = measure(lambda: [record_to_row(rec) for rec in recs])
+    rows = held_dicts[0]
+    held_records = measure(lambda: [record_from_row(row) for row in rows])
+    report("held", n, held_dicts, held_records)
+    same = held_records[0] == recs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seqno_txid.csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_csv(recs, path)
+        read_dicts = measure(lambda: read_dict_rows(path))
+        read_records = measure(lambda: read_csv(path))
+    report("read", n, read_dicts, read_records)
+    same = same and read_records[0] == recs
+
+    print(f"  records round-trip: {same}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
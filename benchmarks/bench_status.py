@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the status engine (apply_status) on synthetic (seqno, sourceId)
+groups, against the original per-row any() scan over each group.
+
+Usage:
+    python benchmarks/bench_status.py [--rows 20000] [--group-size 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from seqno_checker.ids import UNKNOWN_SOURCE
+from seqno_checker.records import TxRecord
+from seqno_checker.status import apply_status
+
+
+def make_records(rows: int, group_size: int, completed_ratio: float, seed: int = 42):
+    rnd = random.Random(seed)
+    records = []
+    completed = []
+    mapping = {}
+    for i in range(rows):
+        txid = rnd.getrandbits(128)
+        group = i // group_size
+        records.append(TxRecord(100000 + group, txid))
+        mapping[txid] = 400000 + group % 7
+        if rnd.random() < completed_ratio:
+            completed.append(txid)
+    return records, completed, mapping
+
+
+def quadratic_status(records, completed_txids, sourceid_mapping):
+    """The original algorithm: scan the whole group for every row."""
+    for rec in records:
+        rec.source_id = sourceid_mapping.get(rec.txid, UNKNOWN_SOURCE)
+    completed_set = set(completed_txids)
+    groups = {}
+    for rec in records:
+        groups.setdefault((rec.seqno, rec.source_id), []).append(rec)
+    for rec in records:
+        if rec.txid in completed_set:
+            rec.status = "Completed"
+        elif any(other.txid in completed_set for other in groups[(rec.seqno, rec.source_id)] if other.txid != rec.txid):
+            rec.status = "Safe to fail"
+        else:
+            rec.status = "Unknown"
+
+
+def timed(fn, records, completed, mapping) -> float:
+    start = time.perf_counter()
+    fn(records, completed, mapping)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--group-size", type=int, default=2000)
+    # A low ratio keeps most rows scanning their whole group in the old algorithm
+    parser.add_argument("--completed-ratio", type=float, default=0.0005)
+    args = parser.parse_args()
+
+    records, completed, mapping = make_records(args.rows, args.group_size, args.completed_ratio)
+    old_records = [TxRecord(r.seqno, r.txid) for r in records]
+
+    new_t = timed(apply_status, records, completed, mapping)
+    old_t = timed(quadratic_status, old_records, completed, mapping)
+
+    same = [r.status for r in records] == [r.status for r in old_records]
+    print(f"rows={args.rows} group_size={args.group_size} completed={len(completed)}")
+    print(f"  quadratic:   {old_t * 1000:10.1f} ms")
+    print(f"  linear:      {new_t * 1000:10.1f} ms  ({old_t / new_t:.0f}x faster)")
+    print(f"  statuses match: {same}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare the pure-Python and NumPy status engines over a range of row counts
+and report the crossover point, to pick SEQNO_VECTORIZE_MIN_ROWS.
+
+Usage:
+    python benchmarks/bench_status_numpy.py [--sizes 1000,10000,100000,1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from seqno_checker.config import DEFAULT_VECTORIZE_MIN_ROWS
+from seqno_checker.ids import UNKNOWN_SOURCE, encode_source_id
+from seqno_checker.records import TxRecord
+from seqno_checker.status import _apply_status_numpy, _apply_status_python, _load_numpy
+
+
+def make_records(rows: int, group_size: int, seed: int = 7):
+    """Records with sourceIds already assigned (a few left Unknown or non-numeric)."""
+    rnd = random.Random(seed)
+    records = []
+    completed = set()
+    for i in range(rows):
+        txid = rnd.getrandbits(128)
+        roll = rnd.random()
+        if roll < 0.05:
+            source = UNKNOWN_SOURCE
+        elif roll < 0.1:
+            source = encode_source_id(f"wallet-{i % 13}")
+        else:
+            source = 400000 + (i // group_size) % 11
+        records.append(TxRecord(100000 + i // group_size, txid, source))
+        if rnd.random() < 0.3:
+            completed.add(txid)
+    return records, completed
+
+
+def best_of(fn, records, completed, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(records, completed)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,5000,20000,50000,100000,300000,1000000")
+    parser.add_argument("--group-size", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if _load_numpy() is None:
+        print("NumPy is not installed; nothing to compare.")
+        sys.exit(1)
+
+    crossover = None
+    print(f"{'rows':>10} {'python ms':>12} {'numpy ms':>12} {'speedup':>8}  match")
+    for size in (int(x) for x in args.sizes.split(",")):
+        records, completed = make_records(size, args.group_size)
+        py_t = best_of(_apply_status_python, records, completed, args.repeat)
+        expected = [r.status for r in records]
+        np_t = best_of(_apply_status_numpy, records, completed, args.repeat)
+        same = expected == [r.status for r in records]
+        print(f"{size:>10} {py_t * 1000:>12.1f} {np_t * 1000:>12.1f} {py_t / np_t:>7.2f}x  {same}")
+        if not same:
+            sys.exit(1)
+        if crossover is None and np_t < py_t:
+            crossover = size
+
+    if crossover is None:
+        print("NumPy path was not faster at any tested size.")
+    else:
+        print(f"NumPy path is faster from ~{crossover} rows "
+              f"(default SEQNO_VECTORIZE_MIN_ROWS={DEFAULT_VECTORIZE_MIN_ROWS})")
+
+
+if __name__ == "__main__":
+    main()
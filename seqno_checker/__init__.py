@@ -0,0 +1,36 @@
+"""
+Find seqnos for TON transaction IDs and check their status via Coralogix DataPrime.
+
+Importing the package does no work: no environment or .env is read and
+requests is only imported when the first client is built.
+
+    from seqno_checker import Config, SeqnoChecker
+
+    with SeqnoChecker(Config.from_env()) as checker:
+        for rec in checker.lookup(tx_id, tenant_id, "2025-01-20T00:00:00Z", "2025-01-21T00:00:00Z"):
+            print(rec.seqno, rec.status)
+"""
+from .checker import SeqnoChecker
+from .config import Config
+from .ids import decode_source_id, decode_txid, encode_source_id, encode_txid
+from .inputs import make_params
+from .output import read_columnar, read_csv
+from .pipeline import NoSeqnosFound, QueryFailed
+from .records import TxRecord, record_from_row, record_to_row
+
+__all__ = [
+    "Config",
+    "NoSeqnosFound",
+    "QueryFailed",
+    "SeqnoChecker",
+    "TxRecord",
+    "decode_source_id",
+    "decode_txid",
+    "encode_source_id",
+    "encode_txid",
+    "make_params",
+    "read_columnar",
+    "read_csv",
+    "record_from_row",
+    "record_to_row",
+]
@@ -0,0 +1,97 @@
+"""SeqnoChecker, the library entry point."""
+import dataclasses
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from .client import DataPrimeClient
+from .config import DEFAULT_OUTPUT_CSV, Config
+from .metrics import RunMetrics
+from .output import JsonlEmitter
+from .pipeline import investigate, recheck, run
+from .plan import QueryPlan, plan_recheck, plan_run
+from .records import TxRecord
+from .timeutil import format_utc, parse_datetime
+
+Timestamp = Union[datetime, str]
+
+
+def _as_utc(value: Timestamp) -> str:
+    return format_utc(value if isinstance(value, datetime) else parse_datetime(value))
+
+
+class SeqnoChecker:
+    """Investigates txIds with one explicitly configured DataPrime client.
+
+    Settings come from `config` (a plain Config() by default; nothing is read
+    from the environment unless Config.from_env() is passed) with keyword
+    overrides applied on top, e.g. SeqnoChecker(api_key="...", concurrency=8).
+    The HTTP client is built on first use and shared by all calls; use the
+    checker as a context manager, or call close(), to release its connections.
+    """
+
+    def __init__(self, config: Optional[Config] = None, **overrides: Any):
+        self.config = dataclasses.replace(config or Config(), **overrides)
+        self._client: Optional[DataPrimeClient] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> DataPrimeClient:
+        with self._client_lock:
+            if self._client is None:
+                if not self.config.api_key:
+                    raise ValueError("No API key configured; set Config.api_key or CORALOGIX_API_KEY.")
+                self._client = DataPrimeClient(self.config.api_key, self.config.url,
+                                               max_in_flight=self.config.concurrency)
+            return self._client
+
+    def investigate(self, tx_ids: List[str], tenant_id: str, start: Timestamp, end: Timestamp) -> List[TxRecord]:
+        """Return the txIds' seqno siblings with sourceIds and statuses.
+
+        start/end are datetimes or any timestamp parse_datetime accepts; unlike
+        the CLI prompt, the window is used as given, without padding.
+        """
+        return investigate(tx_ids, tenant_id, _as_utc(start), _as_utc(end), self.client,
+                           self.config.batch_size, self.config.concurrency, self.config.vectorize_min_rows)
+
+    def lookup(self, tx_id: str, tenant_id: str, start: Timestamp, end: Timestamp) -> List[TxRecord]:
+        """investigate() for a single txId."""
+        return self.investigate([tx_id], tenant_id, start, end)
+
+    def run(self, params: Dict[str, Any], emitter: Optional[JsonlEmitter] = None, resume: bool = True,
+            output_path: str = DEFAULT_OUTPUT_CSV, metrics: Optional[RunMetrics] = None) -> None:
+        """The checkpointed CLI pipeline for params from make_params(); writes output_path.
+
+        Pass a RunMetrics to collect per-stage timings, bytes and row counts.
+        Raises NoSeqnosFound or QueryFailed (from seqno_checker.pipeline) when
+        the run can't go on.
+        """
+        run(params, self.client, self.config, emitter, resume, output_path, metrics)
+
+    def recheck(self, csv_path: str, since: Optional[str] = None, emitter: Optional[JsonlEmitter] = None,
+                metrics: Optional[RunMetrics] = None) -> None:
+        recheck(csv_path, self.client, self.config, since, emitter, metrics)
+
+    def plan(self, params: Dict[str, Any], probe: bool = False, group_size: int = 1,
+             resume: bool = True) -> QueryPlan:
+        """The requests run(params) would send, without running it.
+
+        With probe=True, queries whose inputs are known are sent once as cheap
+        `| count` queries, to predict window splits; otherwise nothing is sent.
+        """
+        return plan_run(params, self.config, self.client if probe else None, group_size, resume)
+
+    def plan_recheck(self, csv_path: str, since: Optional[str] = None, probe: bool = False) -> QueryPlan:
+        return plan_recheck(csv_path, self.config, since, self.client if probe else None)
+
+    def close(self) -> None:
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def __enter__(self) -> "SeqnoChecker":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,58 @@
+"""Stage checkpoints for resuming interrupted runs."""
+import gzip
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from . import log
+from .config import DEFAULT_CHECKPOINT_DIR
+from .output import atomic_write
+
+
+class Checkpoint:
+    """Per-stage outputs of one run, saved so an interrupted run can resume.
+
+    The run ID is a hash of the inputs (txIds, tenant and window), so rerunning
+    with the same inputs picks up after the last completed stage. Stages are
+    "seqnos", "pairs", "completed" and "sourceids"; values are stored as
+    gzipped JSON with IDs in their original string form.
+    """
+
+    def __init__(self, run_id: str, path: str, stages: Dict[str, Any]):
+        self.run_id = run_id
+        self.path = path
+        self.stages = stages
+
+    @classmethod
+    def for_run(cls, tx_ids: List[str], tenant_id: str, start_date: str, end_date: str,
+                fresh: bool = False, directory: Optional[str] = None) -> "Checkpoint":
+        import hashlib
+
+        key = json.dumps([tx_ids, tenant_id, start_date, end_date], separators=(",", ":"))
+        run_id = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(directory or DEFAULT_CHECKPOINT_DIR, f"{run_id}.json.gz")
+        stages: Dict[str, Any] = {}
+        if not fresh and os.path.exists(path):
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    stages = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("Ignoring unreadable checkpoint %s: %s", path, e)
+        return cls(run_id, path, stages)
+
+    def get(self, stage: str) -> Any:
+        return self.stages.get(stage)
+
+    def save(self, stage: str, value: Any) -> None:
+        self.stages[stage] = value
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = json.dumps(self.stages, separators=(",", ":")).encode("utf-8")
+        with atomic_write(self.path, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6))
+
+    def clear(self) -> None:
+        self.stages = {}
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
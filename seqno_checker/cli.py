@@ -0,0 +1,285 @@
+"""Command-line interface. Unlike the library, it loads .env and reads the environment."""
+import argparse
+import contextlib
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from . import log
+from .checker import SeqnoChecker
+from .config import DEFAULT_OUTPUT_CSV, Config
+from .inputs import make_params, prompt_inputs, read_tx_ids
+from .metrics import RunMetrics
+from .openmetrics import enable, start_metrics_server
+from .output import JsonlEmitter
+from .pipeline import NoSeqnosFound, QueryFailed, describe_request_error
+from .tracing import StageSpans, span, start_tracing, stop_tracing
+
+
+def load_env() -> None:
+    """Load a .env file into the environment, when python-dotenv is installed."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def ensure_api_key(config: Config) -> str:
+    if not config.api_key:
+        log.error("ERROR: Please set CORALOGIX_API_KEY environment variable.")
+        sys.exit(1)
+    return config.api_key
+
+
+def print_api_key_status(api_key: Optional[str]) -> None:
+    if api_key:
+        log.info("✅ API key loaded from environment: %s...%s", api_key[:8], api_key[-4:])
+    else:
+        log.info("❌ No API key found in environment variables")
+        log.info("Make sure you have set CORALOGIX_API_KEY in your .env file or environment")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Find seqnos for TON transaction IDs and check their status. "
+                    "Without --tx-file, the inputs are prompted for interactively.",
+    )
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--tx-file", metavar="PATH",
+                       help="file with txIds separated by commas or whitespace ('-' reads stdin)")
+    batch.add_argument("--tenant", help="tenant id")
+    batch.add_argument("--after", metavar="TIMESTAMP",
+                       help="start of the window (padded by 6 hours, as in the prompt); "
+                            "with --watch, where the first poll starts")
+    batch.add_argument("--before", metavar="TIMESTAMP", help="end of the window (padded by 6 hours, as in the prompt)")
+    parser.add_argument("--jobs", metavar="PATH",
+                        help="run every job in a JSON Lines job file on one shared client "
+                             "(--concurrency then caps in-flight requests across all jobs)")
+    watch = parser.add_argument_group("watch mode")
+    watch.add_argument("--watch", action="store_true",
+                       help="keep polling --tenant for new seqno logs and append verdicts to --output")
+    watch.add_argument("--interval", type=float, default=300, help="seconds between polls (default: 300)")
+    watch.add_argument("--state", default="seqno_watch_state.json", metavar="PATH",
+                       help="watermark and unresolved-txId state file (default: seqno_watch_state.json)")
+    watch.add_argument("--once", action="store_true", help="poll a single time and exit (e.g. from cron)")
+    service = parser.add_argument_group("service mode")
+    service.add_argument("--serve", action="store_true", help="run the HTTP lookup service")
+    service.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    service.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    service.add_argument("--cache-ttl", type=float,
+                         help="seconds to cache lookup results (default: $SEQNO_CACHE_TTL or 60)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_CSV, metavar="PATH",
+                        help=f"results CSV (default: {DEFAULT_OUTPUT_CSV})")
+    parser.add_argument("--concurrency", type=int,
+                        help="batched queries to run at once (default: $SEQNO_CONCURRENCY or 4)")
+    parser.add_argument("--batch-size", type=int,
+                        help="txIds or seqnos per query (default: $SEQNO_BATCH_SIZE or 200)")
+    parser.add_argument(
+        "--jsonl", action="store_true",
+        help="stream pairs and status updates to stdout as JSON Lines (progress output goes to stderr)",
+    )
+    parser.add_argument(
+        "--fresh", action="store_true",
+        help="ignore any checkpoint left by an interrupted run with the same inputs",
+    )
+    parser.add_argument(
+        "--recheck", metavar="CSV",
+        help="only re-query rows of an existing results CSV that are still Unknown, and update it in place; "
+             "the window runs from the CSV's modification time minus 10 minutes (or --since) until now",
+    )
+    parser.add_argument(
+        "--since", metavar="TIMESTAMP",
+        help="start of the --recheck window (default: the CSV's modification time minus 10 minutes); "
+             "pass it when the file was copied or edited since its last run",
+    )
+    parser.add_argument(
+        "--metrics-json", metavar="PATH",
+        help="also write the per-stage metrics of a run or --recheck to this JSON file",
+    )
+    planning = parser.add_argument_group("planning (a run or --recheck)")
+    planning.add_argument("--plan", action="store_true",
+                          help="report the requests, query sizes, windows and scan volume the run would have, "
+                               "and exit without querying")
+    planning.add_argument("--probe", action="store_true",
+                          help="with --plan, send each query whose inputs are known once as a '| count' query "
+                               "to predict window splits and latency (scans like the real query, returns one row)")
+    planning.add_argument("--group-size", type=int, default=1, metavar="N",
+                          help="with --plan, txIds per seqno to assume for stages that depend on earlier "
+                               "results (default: 1)")
+    profiling = parser.add_argument_group("profiling (a run or --recheck)")
+    profiling.add_argument("--profile", action="store_true",
+                           help="cProfile each stage and report the hottest functions")
+    profiling.add_argument("--trace-memory", action="store_true",
+                           help="trace allocations with tracemalloc and report the top ones per stage")
+    profiling.add_argument("--profile-dir", default="seqno_profile", metavar="DIR",
+                           help="where .prof files and reports go (default: seqno_profile)")
+    logging = parser.add_argument_group("logging")
+    logging.add_argument("--log-level", choices=sorted(log.LEVELS, key=log.LEVELS.get), dest="log_level",
+                         help="debug adds each request's query and response details "
+                              "(default: $SEQNO_LOG_LEVEL or info)")
+    logging.add_argument("-v", "--verbose", action="store_const", const="debug", dest="log_level",
+                         help="same as --log-level debug")
+    logging.add_argument("-q", "--quiet", action="store_const", const="warning", dest="log_level",
+                         help="same as --log-level warning: only warnings and errors")
+    logging.add_argument("--log-format", choices=("text", "json"), default="text",
+                         help="json writes one {ts, level, msg} object per line (default: text)")
+    parser.add_argument(
+        "--trace", metavar="PATH",
+        help="append spans for stages, windows, DataPrime requests and extractor passes "
+             "to PATH as OTLP/JSON lines",
+    )
+    exposition = parser.add_argument_group("Prometheus/OpenMetrics (--watch and --serve)")
+    exposition.add_argument("--metrics-port", type=int, metavar="PORT",
+                            help="serve counters and histograms on http://<--host>:PORT/metrics")
+    exposition.add_argument("--metrics-textfile", metavar="PATH",
+                            help="with --watch, write them to this .prom file after every poll "
+                                 "(for node_exporter's textfile collector)")
+    args = parser.parse_args(argv)
+    if args.watch and not args.tenant:
+        parser.error("--watch requires --tenant")
+    if (args.probe or args.group_size != 1) and not args.plan:
+        parser.error("--probe and --group-size require --plan")
+    if args.plan and (args.watch or args.serve or args.jobs):
+        parser.error("--plan works with a run or --recheck, not --watch, --serve or --jobs")
+    if args.group_size < 1:
+        parser.error("--group-size must be at least 1")
+    if args.metrics_textfile and not args.watch:
+        parser.error("--metrics-textfile requires --watch")
+    if args.tx_file and not (args.tenant and args.after and args.before):
+        parser.error("--tx-file requires --tenant, --after and --before")
+    if (args.batch_size is not None and args.batch_size < 1) or (args.concurrency is not None and args.concurrency < 1):
+        parser.error("--batch-size and --concurrency must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    load_env()
+    try:
+        log.set_level(args.log_level or os.environ.get("SEQNO_LOG_LEVEL", "info"))
+    except ValueError as e:
+        log.error("Input error: %s", e)
+        sys.exit(2)
+    log.set_format(args.log_format)
+    config = Config.from_env()
+    for name in ("batch_size", "concurrency", "cache_ttl"):
+        if getattr(args, name) is not None:
+            setattr(config, name, getattr(args, name))
+    emitter = JsonlEmitter(sys.stdout) if args.jsonl else None
+    with contextlib.redirect_stdout(sys.stderr) if emitter else contextlib.nullcontext():
+        print_api_key_status(config.api_key)
+        # A plan without a probe sends nothing
+        if not args.plan or args.probe:
+            ensure_api_key(config)
+        if args.trace:
+            start_tracing(args.trace)
+        try:
+            with SeqnoChecker(config) as checker:
+                _dispatch(args, checker, emitter)
+        except QueryFailed as e:
+            log.error("%s", e)
+            sys.exit(e.exit_code)
+        finally:
+            stop_tracing()
+
+
+def _dispatch(args: argparse.Namespace, checker: SeqnoChecker, emitter: Optional[JsonlEmitter]) -> None:
+    config = checker.config
+    if args.metrics_port is not None or args.metrics_textfile:
+        enable()
+        if args.metrics_port is not None:
+            start_metrics_server(args.host, args.metrics_port)
+    if args.plan:
+        _plan(args, checker)
+        return
+    if args.recheck:
+        with _reporting(args) as metrics:
+            checker.recheck(args.recheck, args.since, emitter, metrics)
+        return
+    if args.serve:
+        from .service import serve
+
+        serve(checker.client, args.host, args.port, config)
+        return
+    if args.watch:
+        from .watch import watch
+
+        watch(args.tenant.strip(), checker.client, args.state, args.output, args.interval, args.after, args.once,
+              emitter, config.batch_size, config.concurrency, args.metrics_textfile)
+        return
+    if args.jobs:
+        from .jobs import load_jobs, run_jobs
+
+        try:
+            jobs = load_jobs(args.jobs)
+        except (OSError, ValueError) as e:
+            log.error("Input error: %s", e)
+            sys.exit(2)
+        sys.exit(1 if run_jobs(jobs, checker.client, config, resume=not args.fresh) else 0)
+    params = _read_params(args)
+    with _reporting(args) as metrics:
+        try:
+            checker.run(params, emitter, resume=not args.fresh, output_path=args.output, metrics=metrics)
+        except NoSeqnosFound as e:
+            log.info("%s Exiting.", e)
+
+
+def _read_params(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        if args.tx_file:
+            return make_params(read_tx_ids(args.tx_file), args.tenant.strip(), args.after, args.before)
+        return prompt_inputs()
+    except Exception as e:
+        log.error("Input error: %s", e)
+        sys.exit(2)
+
+
+def _plan(args: argparse.Namespace, checker: SeqnoChecker) -> None:
+    try:
+        if args.recheck:
+            plan = checker.plan_recheck(args.recheck, args.since, args.probe)
+        else:
+            plan = checker.plan(_read_params(args), args.probe, args.group_size, resume=not args.fresh)
+    except Exception as e:
+        # requests' exceptions (which are OSErrors) carry the failed request
+        if getattr(e, "request", None) is not None:
+            log.error(describe_request_error(e, "count probe"))
+            sys.exit(3)
+        log.error("Plan error: %s", e)
+        sys.exit(2)
+    log.info("\nQuery plan:")
+    log.info(plan.summary())
+
+
+@contextlib.contextmanager
+def _reporting(args: argparse.Namespace):
+    """Yield a RunMetrics, then print its summary (and save it) even if the run exits early.
+
+    With --profile/--trace-memory, each stage is also captured by a StageProfiler.
+    """
+    metrics = RunMetrics()
+    profiler = None
+    if args.profile or args.trace_memory:
+        from .profiling import StageProfiler
+
+        profiler = StageProfiler(args.profile_dir, cpu=args.profile, memory=args.trace_memory)
+        metrics.on_stage.append(profiler.start_stage)
+    stages = StageSpans()
+    metrics.on_stage.append(stages.start_stage)
+    root = span("recheck" if args.recheck else "run", **{"tenant": args.tenant or "", "output": args.output})
+    try:
+        with root:
+            try:
+                yield metrics
+            finally:
+                stages.finish()
+    finally:
+        if profiler:
+            log.info("\nProfile:")
+            log.info(profiler.finish())
+        log.info("\nRun metrics:")
+        log.info(metrics.summary())
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+            log.info("Wrote metrics to %s", args.metrics_json)
@@ -0,0 +1,214 @@
+"""DataPrime HTTP client. requests is imported when the first client is built."""
+import contextlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from . import log
+from .config import DEFAULT_CONCURRENCY, DEFAULT_DP_URL
+from .extract import extract_logs_from_response
+from .openmetrics import observe_request
+from .tracing import SPAN_KIND_CLIENT, current_span, span
+
+if TYPE_CHECKING:
+    import requests
+
+    from .metrics import StageMetrics
+
+# DataPrime row limit per query; a window that hits it is split in half
+QUERY_LIMIT = 12000
+# Throttled (429) queries are retried this many times, waiting Retry-After
+# seconds (or 1, 2, 4... without one), but never longer than MAX_RETRY_WAIT
+MAX_THROTTLE_RETRIES = 3
+MAX_RETRY_WAIT = 30.0
+
+
+class FairLimiter:
+    """Caps in-flight requests globally and hands out free slots round-robin by key.
+
+    Waiters are queued per key (e.g. tenant); when a slot frees up it goes to
+    the oldest waiter of the next key in turn, so one tenant with many queued
+    queries can't starve the others.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._active = 0
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+
+    @contextlib.contextmanager
+    def slot(self, key: str = ""):
+        ticket = object()
+        with self._cond:
+            self._queues.setdefault(key, deque()).append(ticket)
+            while self._active >= self.limit or next(iter(self._queues.values()))[0] is not ticket:
+                self._cond.wait()
+            waiting = self._queues[key]
+            waiting.popleft()
+            if waiting:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            self._active += 1
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+
+class DataPrimeClient:
+    """DataPrime query client with a pooled HTTP session.
+
+    Clients made with for_tenant() share the session and the limiter, so many
+    jobs can run on one set of connections under one global concurrency cap.
+    """
+
+    def __init__(self, api_key: str, url: str = DEFAULT_DP_URL, max_in_flight: int = DEFAULT_CONCURRENCY,
+                 session: Optional["requests.Session"] = None, limiter: Optional[FairLimiter] = None,
+                 key: str = ""):
+        self.api_key = api_key
+        self.url = url
+        self.limiter = limiter or FairLimiter(max_in_flight)
+        if session is None:
+            import requests
+            import requests.adapters
+
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.limiter.limit)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}",
+                "X-API-Key": api_key,
+            })
+        self.session = session
+        self.key = key
+
+    def for_tenant(self, tenant_id: str) -> "DataPrimeClient":
+        return DataPrimeClient(self.api_key, self.url, session=self.session, limiter=self.limiter, key=tenant_id)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def query(self, query: str, start_date: str, end_date: str,
+              stats: Optional["StageMetrics"] = None) -> Dict[str, Any]:
+        payload = {
+            "query": query,
+            "metadata": {
+                "startDate": start_date,
+                "endDate": end_date,
+                "syntax": "QUERY_SYNTAX_DATAPRIME",
+                "limit": QUERY_LIMIT
+            },
+        }
+        
+        log.debug("Making request to: %s", self.url)
+        log.debug("Query: %s", query)
+        log.debug("Time range: %s to %s", start_date, end_date)
+        
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            with self.limiter.slot(self.key):
+                sent = time.perf_counter()
+                resp = self.session.post(self.url, json=payload, timeout=60, verify=False)
+                round_trip = time.perf_counter() - sent
+            if stats:
+                stats.add(queries=1, request_sec=round_trip, bytes=len(resp.content))
+            if resp.status_code != 429 or attempt == MAX_THROTTLE_RETRIES:
+                break
+            # Wait outside the limiter, so other tenants' queries can use the slot
+            delay = _retry_delay(resp, attempt)
+            log.warning("429 Too Many Requests; retrying in %.1fs (%d/%d)", delay, attempt + 1, MAX_THROTTLE_RETRIES)
+            time.sleep(delay)
+        sp = current_span()
+        if sp.recording:
+            sp.set("http.response.status_code", resp.status_code)
+            sp.set("http.response.body.size", len(resp.content))
+            if attempt:
+                sp.set("http.request.resend_count", attempt)
+        
+        # Response details; resp.text decodes the whole body, so only when debugging
+        if log.enabled(log.DEBUG):
+            log.debug("Response Status Code: %s", resp.status_code)
+            log.debug("Response Headers: %s", dict(resp.headers))
+            log.debug("Response Content-Type: %s", resp.headers.get("content-type", "Not specified"))
+            log.debug("Response Length: %d characters", len(resp.text))
+            log.debug("First 500 characters of response: %s", resp.text[:500])
+        
+        if resp.status_code == 403:
+            log.error("403 Forbidden - Check your API key. Response: %s", resp.text)
+            log.error("Common causes:\n"
+                      "1. Invalid or expired API key\n"
+                      "2. Incorrect authentication method\n"
+                      "3. Insufficient permissions\n"
+                      "4. Wrong API endpoint")
+            resp.raise_for_status()
+        
+        if resp.status_code != 200:
+            log.error("HTTP Error %s: %s", resp.status_code, resp.text)
+            resp.raise_for_status()
+        
+        # Parse multiple JSON objects from response
+        decode_start = time.perf_counter()
+        try:
+            lines = resp.text.strip().split("\n")
+            json_objects = []
+            
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                    if isinstance(obj, dict):
+                        json_objects.append(obj)
+                except json.JSONDecodeError:
+                    continue
+            
+            log.debug("Parsed %d JSON objects from response", len(json_objects))
+            
+            # Large results arrive as several "result" chunks; merge their rows
+            chunks = [obj for obj in json_objects if "result" in obj]
+            if len(chunks) == 1:
+                return chunks[0]
+            if chunks:
+                return {"result": {"results": [lg for obj in chunks for lg in extract_logs_from_response(obj)]}}
+            
+            return json_objects[0] if json_objects else {}
+            
+        except Exception as e:
+            log.error("Error parsing response: %s", e)
+            raise
+        finally:
+            if stats:
+                stats.add(decode_sec=time.perf_counter() - decode_start)
+
+
+def _retry_delay(resp: "requests.Response", attempt: int) -> float:
+    """Seconds to wait before resending a throttled query: Retry-After, else exponential backoff."""
+    try:
+        delay = float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        # Missing, or an HTTP date
+        delay = 2.0 ** attempt
+    return min(max(delay, 0.0), MAX_RETRY_WAIT)
+
+
+@observe_request
+def request_dataprime(query: str, start_date: str, end_date: str, client: DataPrimeClient,
+                      stats: Optional["StageMetrics"] = None) -> Dict[str, Any]:
+    with span("DataPrime query", SPAN_KIND_CLIENT) as sp:
+        if sp.recording:
+            import hashlib
+
+            sp.set("dataprime.query.hash", hashlib.sha256(query.encode("utf-8")).hexdigest()[:16])
+            sp.set("dataprime.window.start", start_date)
+            sp.set("dataprime.window.end", end_date)
+            sp.set("tenant", client.key)
+        return client.query(query, start_date, end_date, stats)
@@ -0,0 +1,51 @@
+"""Settings, with defaults that can be overridden explicitly or from the environment."""
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+DEFAULT_DP_URL = "https://api.coralogix.us/api/v1/dataprime/query"
+DEFAULT_OUTPUT_CSV = "seqno_txid.csv"
+# txIds/seqnos per query, and how many batched queries run at once
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_CONCURRENCY = 4
+# Where stage checkpoints for resuming interrupted runs are kept
+DEFAULT_CHECKPOINT_DIR = ".seqno_checkpoints"
+# Row count from which apply_status switches to the NumPy path (when installed)
+DEFAULT_VECTORIZE_MIN_ROWS = 100000
+# Service mode: lifetime of cached lookup results, in seconds
+DEFAULT_CACHE_TTL = 60.0
+
+
+@dataclass
+class Config:
+    """Everything a SeqnoChecker needs to know; nothing is read implicitly.
+
+    Use Config.from_env() to pick settings up from CORALOGIX_* and SEQNO_*
+    environment variables (the CLI does this after loading .env).
+    """
+    api_key: Optional[str] = None
+    url: str = DEFAULT_DP_URL
+    batch_size: int = DEFAULT_BATCH_SIZE
+    concurrency: int = DEFAULT_CONCURRENCY
+    checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR
+    # Optional SQLite database that results are also written to
+    sqlite_path: Optional[str] = None
+    # Optional columnar (Parquet, or the built-in SQCOL format) copy of the results
+    columnar_path: Optional[str] = None
+    vectorize_min_rows: int = DEFAULT_VECTORIZE_MIN_ROWS
+    cache_ttl: float = DEFAULT_CACHE_TTL
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Config":
+        env = os.environ if environ is None else environ
+        return cls(
+            api_key=env.get("CORALOGIX_API_KEY") or None,
+            url=env.get("CORALOGIX_DP_URL", DEFAULT_DP_URL),
+            batch_size=int(env.get("SEQNO_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+            concurrency=int(env.get("SEQNO_CONCURRENCY", DEFAULT_CONCURRENCY)),
+            checkpoint_dir=env.get("SEQNO_CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR),
+            sqlite_path=env.get("SEQNO_SQLITE_PATH") or None,
+            columnar_path=env.get("SEQNO_COLUMNAR_PATH") or None,
+            vectorize_min_rows=int(env.get("SEQNO_VECTORIZE_MIN_ROWS", DEFAULT_VECTORIZE_MIN_ROWS)),
+            cache_ttl=float(env.get("SEQNO_CACHE_TTL", DEFAULT_CACHE_TTL)),
+        )
@@ -0,0 +1,180 @@
+"""
+Seeded generator of synthetic DataPrime logs shaped like the real ones.
+
+Each transaction gets an enrichment log (`enrichment object: {"enrichTransaction":
+{"data":{"seqno":...}}}` with its txId, sourceId and tenant), and a share of
+them a `status update to COMPLETED` log. Where the txId and sourceId sit is
+picked per log from these shapes, one per extractor fallback:
+
+    userdata   userData JSON string with metadata.requestContext.txId (the usual case)
+    nested     metadata.requestContext.txId as nested objects on the log itself
+    deep       the metadata object buried further down the log
+    flattened  "metadata.requestContext.txId" as a single dotted key
+    text       only in the message text ("...txId: <uuid>", "SourceId: 455647")
+
+Output is DataPrime NDJSON (a queryId line, then result chunks), which
+mock_server.load_corpus reads. The same seed gives the same corpus.
+
+Usage:
+    python -m seqno_checker.corpus --records 1000000 --out corpus.ndjson [--truth truth.json]
+"""
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from .output import atomic_write
+from .timeutil import format_utc, parse_datetime
+
+SHAPES = ("userdata", "nested", "deep", "flattened", "text")
+DEFAULT_SHAPES = {"userdata": 0.8, "nested": 0.05, "deep": 0.05, "flattened": 0.05, "text": 0.05}
+DEFAULT_START = "2025-01-20T00:00:00Z"
+
+
+def parse_shapes(spec: str) -> Dict[str, float]:
+    """Parse "userdata=0.8,text=0.2" into shape weights."""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SHAPES:
+            raise ValueError(f"unknown shape {name!r}; expected one of {', '.join(SHAPES)}")
+        weights[name] = float(weight) if weight else 1.0
+    return weights
+
+
+def _uuid(rnd: random.Random) -> str:
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+
+def _shape_log(shape: str, message: str, txid: str, source_id: Optional[str], tenant_id: str,
+               timestamp: str) -> Dict[str, Any]:
+    meta: Dict[str, Any] = {"requestContext": {"txId": txid}}
+    if source_id is not None:
+        meta["transaction"] = {"sourceId": source_id}
+    if shape == "userdata":
+        user_data = {"message": message, "tenantId": tenant_id, "metadata": meta}
+        return {
+            "metadata": [{"key": "timestamp", "value": timestamp}],
+            "labels": [{"key": "applicationname", "value": "ton-processor"}],
+            "userData": json.dumps(user_data, separators=(",", ":")),
+        }
+    log: Dict[str, Any] = {"timestamp": timestamp, "tenantId": tenant_id}
+    if shape == "nested":
+        log.update(message=message, metadata=meta)
+    elif shape == "deep":
+        log["payload"] = {"event": {"text": message, "context": {"metadata": meta}}}
+    elif shape == "flattened":
+        log["msg"] = message
+        log["metadata.requestContext.txId"] = txid
+        if source_id is not None:
+            log["metadata.transaction.sourceId"] = source_id
+    else:
+        text = f"{message} metadata.requestContext.txId: {txid}"
+        if source_id is not None:
+            text += f" SourceId: {source_id}"
+        log["text"] = text
+    return log
+
+
+def generate_logs(records: int, seed: int = 0, group_size: int = 4, sources: int = 50, tenants: int = 1,
+                  completed_ratio: float = 0.3, shapes: Optional[Dict[str, float]] = None,
+                  start: str = DEFAULT_START, span: timedelta = timedelta(hours=1),
+                  truth: Optional[List[list]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the logs for `records` transactions, in timestamp order.
+
+    Consecutive transactions share a seqno `group_size` at a time; sourceIds
+    and tenants are drawn from `sources` and `tenants` distinct values. When
+    `truth` is given, [txId, seqno, sourceId, tenant, completed] is appended to
+    it for every transaction.
+    """
+    rnd = random.Random(seed)
+    weights = shapes or DEFAULT_SHAPES
+    names, cum = list(weights), []
+    total = 0.0
+    for name in names:
+        total += weights[name]
+        cum.append(total)
+    tenant_ids = [_uuid(rnd) for _ in range(max(1, tenants))]
+    source_ids = [str(400000 + rnd.randrange(100000)) for _ in range(max(1, sources))]
+    start_ts = parse_datetime(start).timestamp()
+    step = span.total_seconds() / max(1, records)
+
+    def pick_shape() -> str:
+        roll = rnd.random() * total
+        for name, edge in zip(names, cum):
+            if roll < edge:
+                return name
+        return names[-1]
+
+    for i in range(records):
+        seqno = 100000 + i // max(1, group_size)
+        txid = _uuid(rnd)
+        source_id = source_ids[rnd.randrange(len(source_ids))]
+        tenant_id = tenant_ids[(i // max(1, group_size)) % len(tenant_ids)]
+        completed = rnd.random() < completed_ratio
+        ts = start_ts + i * step
+        # Some producers log the seqno as a string
+        seq_value = json.dumps(str(seqno) if rnd.random() < 0.1 else seqno)
+        enrichment = 'enrichment object: {"enrichTransaction":{"data":{"seqno":%s,"workchain":0}}}' % seq_value
+        yield _shape_log(pick_shape(), enrichment, txid, source_id, tenant_id,
+                         format_utc(datetime.fromtimestamp(ts, timezone.utc)))
+        if completed:
+            yield _shape_log(pick_shape(), f"Transaction {txid} status update to COMPLETED", txid, None, tenant_id,
+                             format_utc(datetime.fromtimestamp(ts + step / 2, timezone.utc)))
+        if truth is not None:
+            truth.append([txid, seqno, source_id, tenant_id, completed])
+
+
+def write_corpus(path: str, logs: Iterator[Dict[str, Any]], chunk_size: int = 1000) -> int:
+    """Write logs as one DataPrime NDJSON response; returns the number of logs."""
+    count = 0
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"queryId": {"queryId": "synthetic"}}) + "\n")
+        chunk: List[Dict[str, Any]] = []
+        for log in logs:
+            chunk.append(log)
+            if len(chunk) >= chunk_size:
+                f.write(json.dumps({"result": {"results": chunk}}, separators=(",", ":")) + "\n")
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            f.write(json.dumps({"result": {"results": chunk}}, separators=(",", ":")) + "\n")
+            count += len(chunk)
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic DataPrime log corpus.")
+    parser.add_argument("--records", type=int, default=10000, help="transactions to generate (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--group-size", type=int, default=4, help="txIds per seqno (default: 4)")
+    parser.add_argument("--sources", type=int, default=50, help="distinct sourceIds (default: 50)")
+    parser.add_argument("--tenants", type=int, default=1, help="distinct tenants (default: 1)")
+    parser.add_argument("--completed-ratio", type=float, default=0.3,
+                        help="share of transactions with a COMPLETED log (default: 0.3)")
+    parser.add_argument("--shapes", type=parse_shapes, metavar="SPEC",
+                        help="shape weights, e.g. userdata=0.8,nested=0.05,deep=0.05,flattened=0.05,text=0.05")
+    parser.add_argument("--start", default=DEFAULT_START, help=f"first log timestamp (default: {DEFAULT_START})")
+    parser.add_argument("--span-hours", type=float, default=1.0, help="hours the logs are spread over (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="logs per NDJSON result line (default: 1000)")
+    parser.add_argument("--out", required=True, metavar="PATH", help="NDJSON corpus to write")
+    parser.add_argument("--truth", metavar="PATH",
+                        help="also write [txId, seqno, sourceId, tenant, completed] per transaction as JSON")
+    args = parser.parse_args(argv)
+
+    truth: Optional[List[list]] = [] if args.truth else None
+    logs = generate_logs(args.records, args.seed, args.group_size, args.sources, args.tenants,
+                         args.completed_ratio, args.shapes, args.start, timedelta(hours=args.span_hours), truth)
+    count = write_corpus(args.out, logs, args.chunk_size)
+    print(f"Wrote {count} logs for {args.records} transactions to {args.out}")
+    if truth is not None:
+        with atomic_write(args.truth, "w", encoding="utf-8") as f:
+            json.dump(truth, f, separators=(",", ":"))
+        print(f"Wrote ground truth to {args.truth}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Pull seqnos, seqno/txId pairs, completions and sourceIds out of DataPrime logs."""
+import json
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .ids import SourceKey, TxKey, encode_source_id, encode_txid
+from .metrics import FALLBACKS
+from .openmetrics import observe_extractor
+from .records import TxRecord
+from .tracing import traced_extractor
+
+TXID_PATH = ["metadata", "requestContext", "txId"]
+SOURCE_ID_PATH = ["metadata", "transaction", "sourceId"]
+_TXID_TEXT_RE = re.compile(r"metadata\.requestContext\.txId[\"']?\s*[:=]\s*[\"']?([0-9a-fA-F-]{20,})")
+_SOURCE_ID_LABEL_RE = re.compile(r"SourceId:\s*(\d+)")
+_SOURCE_ID_KEY_RE = re.compile(r"sourceId[\"']?\s*[:=]\s*[\"']?(\d+)")
+
+
+def extract_logs_from_response(resp: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Try several common keys
+    for key in ("data", "results", "logs", "records", "hits"):
+        val = resp.get(key)
+        if isinstance(val, list):
+            return val
+    # Some APIs wrap under 'result' or 'response'
+    for key in ("result", "response"):
+        val = resp.get(key)
+        if isinstance(val, dict):
+            for inner in ("data", "results", "logs", "records", "hits"):
+                v2 = val.get(inner)
+                if isinstance(v2, list):
+                    return v2
+    return []
+
+
+def deep_get(obj: Any, keys: List[str], default: Any = None) -> Any:
+    cur = obj
+    for k in keys:
+        if isinstance(cur, dict) and k in cur:
+            cur = cur[k]
+        else:
+            return default
+    return cur
+
+
+def find_key_recursive(obj: Any, target_path: List[str]) -> Optional[Any]:
+    # Tries to find a nested path like ["metadata","requestContext","txId"] anywhere in the dict
+    if not isinstance(obj, dict):
+        return None
+    def _walk(node: Any, path: List[str]) -> Optional[Any]:
+        if not path:
+            return node
+        if isinstance(node, dict):
+            head, tail = path[0], path[1:]
+            if head in node:
+                return _walk(node[head], tail)
+            # search all children for potential subpath
+            for v in node.values():
+                found = _walk(v, path)
+                if found is not None:
+                    return found
+        elif isinstance(node, list):
+            for it in node:
+                found = _walk(it, path)
+                if found is not None:
+                    return found
+        return None
+    return _walk(obj, target_path)
+
+
+def extract_json_after_label_from_text(text: str, label: str = "enrichment object:") -> Optional[Dict[str, Any]]:
+    if not isinstance(text, str):
+        return None
+    idx = text.find(label)
+    start = 0 if idx == -1 else idx + len(label)
+    brace = text.find("{", start)
+    if brace == -1:
+        return None
+    snippet = text[brace:]
+    # Try to balance braces roughly
+    depth = 0
+    end_idx = None
+    for i, ch in enumerate(snippet):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                end_idx = i + 1
+                break
+    if end_idx is None:
+        return None
+    json_str = snippet[:end_idx].strip()
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        return None
+
+
+def extract_message_field(log: Dict[str, Any]) -> Optional[str]:
+    # Try common message/text fields
+    for key in ("message", "text", "body", "content", "log", "msg"):
+        val = log.get(key)
+        if isinstance(val, str):
+            return val
+    
+    # Check userData field which contains JSON with message
+    user_data = log.get("userData")
+    if user_data and isinstance(user_data, str):
+        try:
+            user_data_obj = json.loads(user_data)
+            if isinstance(user_data_obj, dict):
+                message = user_data_obj.get("message")
+                if isinstance(message, str):
+                    return message
+        except json.JSONDecodeError:
+            pass
+    # Sometimes message is nested
+    # Try to join stringy values to search
+    flattened = []
+    def _collect_strings(node: Any):
+        if isinstance(node, str):
+            flattened.append(node)
+        elif isinstance(node, dict):
+            for v in node.values():
+                _collect_strings(v)
+        elif isinstance(node, list):
+            for v in node:
+                _collect_strings(v)
+    _collect_strings(log)
+    if flattened:
+        # Prefer lines containing 'enrichment object'
+        for s in flattened:
+            if "enrichment object" in s:
+                return s
+        return flattened[0]
+    return None
+
+
+def _parse_user_data(lg: Dict[str, Any]) -> Any:
+    user_data = lg.get("userData")
+    if user_data and isinstance(user_data, str):
+        try:
+            return json.loads(user_data)
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+def _txid_from_text(lg: Dict[str, Any], user_data_obj: Any) -> Optional[str]:
+    # As last resort, scan strings that look like 'metadata.requestContext.txId:<uuid>'
+    m = _TXID_TEXT_RE.search(json.dumps(lg, ensure_ascii=False))
+    return m.group(1) if m else None
+
+
+def _source_id_from_message(lg: Dict[str, Any], user_data_obj: Any) -> Optional[str]:
+    # Look for patterns like "SourceId: 455647" or "sourceId":"455647" in the message
+    message = extract_message_field(lg)
+    if not message:
+        return None
+    m = _SOURCE_ID_LABEL_RE.search(message) or _SOURCE_ID_KEY_RE.search(message)
+    return m.group(1) if m else None
+
+
+def _source_id_from_text(lg: Dict[str, Any], user_data_obj: Any) -> Optional[str]:
+    # As last resort, scan all text for sourceId patterns
+    text = json.dumps(lg, ensure_ascii=False)
+    m = _SOURCE_ID_KEY_RE.search(text) or _SOURCE_ID_LABEL_RE.search(text)
+    return m.group(1) if m else None
+
+
+Strategy = Tuple[str, Callable[[Dict[str, Any], Any], Any]]
+
+# Fallback chains, tried in order until one finds a value. Each strategy gets
+# the log and its parsed userData (None when absent or not JSON).
+TXID_STRATEGIES: List[Strategy] = [
+    ("userdata", lambda lg, ud: deep_get(ud, TXID_PATH)),
+    ("deep_get", lambda lg, ud: deep_get(lg, TXID_PATH)),
+    ("find_key_recursive", lambda lg, ud: find_key_recursive(lg, TXID_PATH)),
+    # sometimes it's flattened as "metadata.requestContext.txId"
+    ("flattened", lambda lg, ud: lg.get("metadata.requestContext.txId")),
+    ("text_scan", _txid_from_text),
+]
+SOURCE_ID_STRATEGIES: List[Strategy] = [
+    ("userdata", lambda lg, ud: deep_get(ud, SOURCE_ID_PATH)),
+    ("deep_get", lambda lg, ud: deep_get(lg, SOURCE_ID_PATH)),
+    ("find_key_recursive", lambda lg, ud: find_key_recursive(lg, SOURCE_ID_PATH)),
+    ("flattened", lambda lg, ud: lg.get("metadata.transaction.sourceId")),
+    ("message", _source_id_from_message),
+    ("text_scan", _source_id_from_text),
+]
+
+
+def _new_tally(strategies: List[Strategy]) -> Dict[str, List[float]]:
+    return {name: [0, 0, 0.0] for name, _ in strategies}
+
+
+def _first_hit(strategies: List[Strategy], lg: Dict[str, Any], user_data_obj: Any,
+               tally: Dict[str, List[float]]) -> Any:
+    """The first non-None strategy result, tallying [attempts, hits, seconds] per strategy.
+
+    Only the fallbacks are timed: the first strategy finds nearly every value,
+    and two perf_counter() calls per log would add a noticeable share of its cost.
+    """
+    name, find = strategies[0]
+    value = find(lg, user_data_obj)
+    counts = tally[name]
+    counts[0] += 1
+    if value is not None:
+        counts[1] += 1
+        return value
+    start = time.perf_counter()
+    for name, find in strategies[1:]:
+        value = find(lg, user_data_obj)
+        now = time.perf_counter()
+        counts = tally[name]
+        counts[0] += 1
+        counts[2] += now - start
+        if value is not None:
+            counts[1] += 1
+            return value
+        start = now
+    return None
+
+
+@observe_extractor("seqnos")
+@traced_extractor("seqnos")
+def extract_seqnos_from_logs(logs: List[Dict[str, Any]]) -> List[int]:
+    seqnos: List[int] = []
+    for lg in logs:
+        msg = extract_message_field(lg)
+        parsed = extract_json_after_label_from_text(msg or "")
+        if not parsed:
+            # Some sources put JSON directly in message
+            try:
+                parsed = json.loads(msg) if msg else None
+            except Exception:
+                parsed = None
+        if not parsed:
+            continue
+        # Expected: {"enrichTransaction":{"data":{"seqno":280141,...}}}
+        seq = deep_get(parsed, ["enrichTransaction", "data", "seqno"])
+        if isinstance(seq, int):
+            seqnos.append(seq)
+        else:
+            # Sometimes seqno can be string
+            if isinstance(seq, str) and seq.isdigit():
+                seqnos.append(int(seq))
+    # de-duplicate, keep order
+    seen = set()
+    uniq: List[int] = []
+    for s in seqnos:
+        if s not in seen:
+            seen.add(s)
+            uniq.append(s)
+    return uniq
+
+
+def extract_pairs_seqno_txid(logs: List[Dict[str, Any]]) -> List[TxRecord]:
+    return list(iter_pairs_seqno_txid(logs))
+
+
+@observe_extractor("pairs")
+@traced_extractor("pairs")
+def iter_pairs_seqno_txid(logs: List[Dict[str, Any]]) -> Iterator[TxRecord]:
+    """Yield seqno/txId records one at a time as they are extracted."""
+    tally = _new_tally(TXID_STRATEGIES)
+    try:
+        yield from _iter_pairs(logs, tally)
+    finally:
+        FALLBACKS.merge("txid", tally)
+
+
+def _iter_pairs(logs: List[Dict[str, Any]], tally: Dict[str, List[float]]) -> Iterator[TxRecord]:
+    for lg in logs:
+        msg = extract_message_field(lg)
+        parsed = extract_json_after_label_from_text(msg or "")
+        if not parsed:
+            try:
+                parsed = json.loads(msg) if msg else None
+            except Exception:
+                parsed = None
+        if not parsed:
+            continue
+        seq = deep_get(parsed, ["enrichTransaction", "data", "seqno"])
+        if isinstance(seq, str) and seq.isdigit():
+            seq = int(seq)
+        if not isinstance(seq, int):
+            continue
+        # Try to get txId from userData first, then the other locations
+        txid = _first_hit(TXID_STRATEGIES, lg, _parse_user_data(lg), tally)
+        if txid is None:
+            continue
+        yield TxRecord(seq, encode_txid(str(txid)))
+
+
+@observe_extractor("completed")
+@traced_extractor("completed")
+def extract_completed_txids(logs: List[Dict[str, Any]]) -> List[TxKey]:
+    """Extract (encoded) transaction IDs that have COMPLETED status from logs."""
+    completed_txids = []
+    tally = _new_tally(TXID_STRATEGIES)
+    for lg in logs:
+        # Try to get txId from userData first, then the other locations
+        txid = _first_hit(TXID_STRATEGIES, lg, _parse_user_data(lg), tally)
+        if txid:
+            completed_txids.append(encode_txid(str(txid)))
+    FALLBACKS.merge("txid", tally)
+    
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_txids = []
+    for txid in completed_txids:
+        if txid not in seen:
+            seen.add(txid)
+            unique_txids.append(txid)
+    
+    return unique_txids
+
+
+@observe_extractor("sourceids")
+@traced_extractor("sourceids")
+def extract_source_ids(logs: List[Dict[str, Any]]) -> Dict[TxKey, SourceKey]:
+    """Extract sourceId for each transaction ID from logs, keyed by encoded txId."""
+    txid_to_sourceid = {}
+    txid_tally = _new_tally(TXID_STRATEGIES)
+    source_tally = _new_tally(SOURCE_ID_STRATEGIES)
+    
+    for lg in logs:
+        # Try to get txId from userData first, then the other locations
+        user_data_obj = _parse_user_data(lg)
+        txid = _first_hit(TXID_STRATEGIES, lg, user_data_obj, txid_tally)
+        if not txid:
+            continue
+        # Then the sourceId: userData, other locations, the message, and the whole log as text
+        sourceid = _first_hit(SOURCE_ID_STRATEGIES, lg, user_data_obj, source_tally)
+        if sourceid:
+            txid_to_sourceid[encode_txid(str(txid))] = encode_source_id(str(sourceid))
+    
+    FALLBACKS.merge("txid", txid_tally)
+    FALLBACKS.merge("source_id", source_tally)
+    return txid_to_sourceid
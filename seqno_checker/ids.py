@@ -0,0 +1,43 @@
+"""
+Internal ID encoding: canonical UUID txIds become 128-bit ints, numeric
+sourceIds become ints and everything else is an interned string. IDs are
+only turned back into strings when they are written out.
+"""
+import re
+import sys
+from typing import Union
+
+TxKey = Union[int, str]
+SourceKey = Union[int, str]
+
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+UNKNOWN_SOURCE: SourceKey = sys.intern("Unknown")
+
+
+def encode_txid(value: TxKey) -> TxKey:
+    if isinstance(value, int):
+        return value
+    # Only canonical (lower-case, hyphenated) UUIDs so decoding round-trips exactly
+    if len(value) == 36 and _UUID_RE.fullmatch(value):
+        return int(value.replace("-", ""), 16)
+    return sys.intern(value)
+
+
+def decode_txid(key: TxKey) -> str:
+    if isinstance(key, int):
+        h = f"{key:032x}"
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+    return key
+
+
+def encode_source_id(value: SourceKey) -> SourceKey:
+    if isinstance(value, int):
+        return value
+    # No leading zeros, so str(int(value)) gives back the original text
+    if value.isascii() and value.isdigit() and (value == "0" or value[0] != "0"):
+        return int(value)
+    return sys.intern(value)
+
+
+def decode_source_id(key: SourceKey) -> str:
+    return str(key) if isinstance(key, int) else key
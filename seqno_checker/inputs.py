@@ -0,0 +1,56 @@
+"""Reading and validating run inputs (txIds, tenant and window)."""
+import re
+import sys
+from typing import Any, Dict, List
+
+from .timeutil import parse_datetime, parse_utc_timestamp
+
+
+def split_tx_ids(text: str) -> List[str]:
+    """Split comma/whitespace separated txIds, dropping blanks and duplicates."""
+    # split by comma or whitespace
+    return list(dict.fromkeys(t for t in re.split(r"[,\s]+", text) if t))
+
+
+def make_params(tx_ids: List[str], tenant_id: str, after_raw: str, before_raw: str) -> Dict[str, Any]:
+    if not tx_ids:
+        raise ValueError("No valid transaction IDs provided.")
+    if not tenant_id:
+        raise ValueError("No tenant id provided.")
+
+    after_date = parse_utc_timestamp(after_raw, is_after=True)
+    before_date = parse_utc_timestamp(before_raw, is_after=False)
+    
+    # Validate that after is earlier than before
+    if parse_datetime(after_date) >= parse_datetime(before_date):
+        raise ValueError("'after' must be earlier than 'before'.")
+
+    return {
+        "tx_ids": tx_ids,
+        "tenant_id": tenant_id,
+        "after_date": after_date,
+        "before_date": before_date,
+    }
+
+
+def prompt_inputs() -> Dict[str, Any]:
+    print("Enter transaction IDs (comma or space separated):")
+    tx_ids = split_tx_ids(input("> ").strip())
+
+    print("Enter tenant id:")
+    tenant_id = input("> ").strip()
+
+    print("Enter 'after' timestamp (e.g., 'Sep 7, 2025, 4:15:50 PM', '7 Sept 2025, 16:15:59', or '2025-01-20T00:00:00Z'):")
+    after_raw = input("> ").strip()
+    print("Enter 'before' timestamp (e.g., 'Sep 7, 2025, 7:15:50 PM', '7 Sept 2025, 19:15:59', or '2025-01-20T00:00:00Z'):")
+    before_raw = input("> ").strip()
+
+    return make_params(tx_ids, tenant_id, after_raw, before_raw)
+
+
+def read_tx_ids(path: str) -> List[str]:
+    """Read txIds from a file, or from stdin when path is '-'."""
+    if path == "-":
+        return split_tx_ids(sys.stdin.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return split_tx_ids(f.read())
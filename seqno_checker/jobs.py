@@ -0,0 +1,77 @@
+"""--jobs: many tenants' runs on one shared client."""
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+from . import log
+from .client import DataPrimeClient
+from .config import Config
+from .inputs import make_params, read_tx_ids, split_tx_ids
+from .pipeline import NoSeqnosFound, run
+
+# Upper bound on jobs driven at once (requests are capped separately)
+MAX_PARALLEL_JOBS = 32
+
+
+def load_jobs(path: str) -> List[Dict[str, Any]]:
+    """Read a JSON Lines job file.
+
+    Each line is an object with "tenant", "after", "before", the txIds as
+    "tx_ids" (a list or a comma/whitespace separated string) or "tx_file",
+    and optionally "output".
+    """
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON: {e}") from None
+            if not isinstance(job, dict) or not all(job.get(k) for k in ("tenant", "after", "before")):
+                raise ValueError(f"{path}:{lineno}: a job needs 'tenant', 'after' and 'before'")
+            if not (job.get("tx_ids") or job.get("tx_file")):
+                raise ValueError(f"{path}:{lineno}: a job needs 'tx_ids' or 'tx_file'")
+            jobs.append(job)
+    return jobs
+
+
+def run_jobs(jobs: List[Dict[str, Any]], client: DataPrimeClient, config: Config, resume: bool = True) -> int:
+    """Run all jobs concurrently on one shared client; returns the number that failed.
+
+    The client's limiter caps DataPrime requests in flight across all jobs,
+    and free slots rotate between tenants. Each job writes its CSV as soon as it
+    finishes.
+    """
+
+    def _run_job(n: int, job: Dict[str, Any]) -> str:
+        tenant_id = str(job["tenant"]).strip()
+        raw = job.get("tx_ids")
+        if raw:
+            tx_ids = split_tx_ids(raw if isinstance(raw, str) else " ".join(map(str, raw)))
+        else:
+            tx_ids = read_tx_ids(job["tx_file"])
+        params = make_params(tx_ids, tenant_id, job["after"], job["before"])
+        slug = re.sub(r"[^\w.-]", "_", tenant_id)
+        output = job.get("output") or f"seqno_txid_{slug}_{n}.csv"
+        run(params, client.for_tenant(tenant_id), config, resume=resume, output_path=output)
+        return output
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), MAX_PARALLEL_JOBS))) as pool:
+        futures = {pool.submit(_run_job, n, job): (n, job) for n, job in enumerate(jobs, 1)}
+        for future in as_completed(futures):
+            n, job = futures[future]
+            exc = future.exception()
+            # A job with no seqnos has nothing to report, which isn't a failure
+            if exc is None or isinstance(exc, NoSeqnosFound):
+                done = future.result() if exc is None else "no seqnos found"
+                log.info("Job %s (%s) finished: %s", n, job['tenant'], done)
+            else:
+                failed += 1
+                log.error("Job %s (%s) failed: %r", n, job['tenant'], exc)
+    log.info("%d/%d jobs succeeded.", len(jobs) - failed, len(jobs))
+    return failed
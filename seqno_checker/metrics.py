@@ -0,0 +1,175 @@
+"""
+Per-stage run metrics: where the time, bytes and rows of a run go.
+
+Each stage (seqnos, pairs, completed, sourceids, then status and write) gets
+a StageMetrics that the pipeline and the client add to:
+
+    queries      DataPrime requests sent (window splits included)
+    build_sec    building the batched query strings
+    request_sec  HTTP round trips, response download included
+    bytes        response body bytes
+    decode_sec   parsing the NDJSON response
+    extract_sec  running the extractor over the fetched logs
+    logs         logs fetched
+    rows         values the stage produced (seqnos, pairs, txIds, records)
+    wall_sec     elapsed time for fetching and extracting
+
+request_sec and decode_sec are summed over a stage's queries, so with
+--concurrency above 1 they can exceed wall_sec.
+
+FALLBACKS counts, for each fallback strategy the extractors use to find a
+txId or sourceId, how often it was tried, how often it found the value and
+the time spent in it. The first strategy of each chain is not timed, so its
+seconds stay 0. A run's summary shows the counts for that run.
+"""
+import contextlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from .output import atomic_write
+from .timeutil import format_utc
+
+FIELDS = ("queries", "build_sec", "request_sec", "bytes", "decode_sec", "extract_sec", "logs", "rows", "wall_sec")
+
+
+class StageMetrics:
+    """Counters for one stage; add() is safe to call from the fetch threads."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.values: Dict[str, float] = dict.fromkeys(FIELDS, 0)
+        self.resumed = False
+        self._lock = threading.Lock()
+
+    def add(self, **amounts: float) -> None:
+        with self._lock:
+            for field, amount in amounts.items():
+                self.values[field] += amount
+
+    @contextlib.contextmanager
+    def timer(self, *fields: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(**{field: elapsed for field in fields})
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.values, resumed=self.resumed)
+
+
+class FallbackStats:
+    """Process-wide attempts / hits / seconds per (field, strategy).
+
+    Extractors tally into a local dict per call and merge() it once at the end,
+    so the lock is taken once per call, not once per log.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str], List[float]] = {}
+
+    def merge(self, field: str, tally: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for strategy, (attempts, hits, seconds) in tally.items():
+                if not attempts:
+                    continue
+                counts = self._counts.setdefault((field, strategy), [0, 0, 0.0])
+                counts[0] += attempts
+                counts[1] += hits
+                counts[2] += seconds
+
+    def snapshot(self) -> Dict[Tuple[str, str], List[float]]:
+        with self._lock:
+            return {key: list(counts) for key, counts in self._counts.items()}
+
+
+FALLBACKS = FallbackStats()
+
+
+class RunMetrics:
+    """The stages of one run, in the order they started.
+
+    The pipeline creates each stage as it begins, so the `on_stage` callbacks
+    (e.g. StageProfiler.start_stage) mark the boundaries between stages.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.on_stage: List[Callable[[str], None]] = []
+        self._start = time.perf_counter()
+        self._stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+        self._fallbacks_before = FALLBACKS.snapshot()
+
+    def stage(self, name: str) -> StageMetrics:
+        with self._lock:
+            stats = self._stages.get(name)
+            started = stats is None
+            if started:
+                stats = self._stages[name] = StageMetrics(name)
+        if started:
+            for callback in self.on_stage:
+                callback(name)
+        return stats
+
+    def fallbacks(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Fallback strategy counts since this RunMetrics was created, by field then strategy."""
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (field, strategy), (attempts, hits, seconds) in FALLBACKS.snapshot().items():
+            before = self._fallbacks_before.get((field, strategy), [0, 0, 0.0])
+            if attempts == before[0]:
+                continue
+            result.setdefault(field, {})[strategy] = {
+                "attempts": attempts - before[0], "hits": hits - before[1], "seconds": seconds - before[2],
+            }
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = list(self._stages.values())
+        return {
+            "started_at": format_utc(self.started_at),
+            "total_sec": time.perf_counter() - self._start,
+            "stages": {st.name: st.to_dict() for st in stages},
+            "fallbacks": self.fallbacks(),
+        }
+
+    def summary(self) -> str:
+        data = self.to_dict()
+        lines = [f"{'stage':<10} {'queries':>7} {'build ms':>9} {'request ms':>11} {'KiB':>9} {'decode ms':>10} "
+                 f"{'extract ms':>11} {'logs':>8} {'rows':>8} {'wall ms':>9}"]
+        for name, v in data["stages"].items():
+            queries = "ckpt" if v["resumed"] else str(v["queries"])
+            lines.append(f"{name:<10} {queries:>7} {v['build_sec'] * 1000:>9.1f} {v['request_sec'] * 1000:>11.1f} "
+                         f"{v['bytes'] / 1024:>9.1f} {v['decode_sec'] * 1000:>10.1f} "
+                         f"{v['extract_sec'] * 1000:>11.1f} {v['logs']:>8} {v['rows']:>8} "
+                         f"{v['wall_sec'] * 1000:>9.1f}")
+        lines.append(f"total {data['total_sec']:.2f}s")
+        if data["fallbacks"]:
+            lines.append("")
+            lines.append(f"{'field':<10} {'strategy':<20} {'attempts':>9} {'hits':>9} {'hit %':>6} "
+                         f"{'total ms':>9} {'us/try':>7}")
+            for field, strategies in data["fallbacks"].items():
+                for strategy, v in strategies.items():
+                    if v["seconds"]:
+                        timing = f"{v['seconds'] * 1000:>9.1f} {v['seconds'] * 1e6 / v['attempts']:>7.1f}"
+                    else:
+                        timing = f"{'-':>9} {'-':>7}"
+                    lines.append(f"{field:<10} {strategy:<20} {v['attempts']:>9} {v['hits']:>9} "
+                                 f"{100 * v['hits'] / v['attempts']:>6.1f} {timing}")
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        with atomic_write(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def timer(stats: Optional[StageMetrics], *fields: str) -> ContextManager[None]:
+    """stats.timer(*fields), or a no-op when there is nothing to record into."""
+    return stats.timer(*fields) if stats else contextlib.nullcontext()
@@ -0,0 +1,413 @@
+"""
+Stand-in for the DataPrime query endpoint, for offline benchmarks and tests.
+
+Serves POST /api/v1/dataprime/query over a corpus of logs held in memory and
+answers the way the checker expects from Coralogix: NDJSON lines (a queryId,
+a warning when the row limit was hit, then the rows in one or more "result"
+chunks). Only `source logs | filter ...` queries built from `$d ~~ '...'`,
+`&&`, `||` and parentheses are understood, which is all the checker sends,
+optionally ending in `| count` (the --plan probe), which answers with one
+row whose userData is {"_count": N}.
+
+`$d ~~ 'text'` is evaluated as a case-insensitive free-text match on the log's
+userData (or the whole log when there is none) with JSON quoting removed, so
+'seqno:42' matches "seqno":42; a match must not continue a word on either
+side, so 'seqno:42' does not match seqno:420.
+
+Usage:
+    python -m seqno_checker.mock_server --corpus logs.ndjson [--port 8089] [--latency 0.05]
+    CORALOGIX_DP_URL=http://127.0.0.1:8089/api/v1/dataprime/query python automation.py ...
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from .client import QUERY_LIMIT
+from .timeutil import parse_datetime
+
+DP_QUERY_PATH = "/api/v1/dataprime/query"
+# Rows returned when a request doesn't set metadata.limit
+DEFAULT_LIMIT = 2000
+DEFAULT_CHUNK_SIZE = 1000
+
+_TOKEN_RE = re.compile(r"\s*(?:(?P<str>'(?:[^'\\]|\\.)*')|(?P<op>~~|&&|\|\||[()|])|(?P<word>[$\w]+))")
+_COUNT_STAGE = re.compile(r"\|\s*count\s*$")
+_UUID_TERM = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+# Lookahead so overlapping candidates are all indexed
+_UUID_SCAN = re.compile(r"(?=([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}))")
+# "seqno":42 and "seqno":"42" both normalize to seqno:42
+_SEQNO_TERM = re.compile(r"seqno:\d+")
+
+
+def _indexed(term: str) -> bool:
+    """Whether every log containing `term` is in the index under it.
+
+    Only UUIDs and seqno:N are indexed. That covers txIds, and tenant IDs
+    when they are UUIDs, as in generated corpora. Other terms are checked on
+    the index hits, or by a full scan when a conjunction has no indexed term.
+    """
+    return bool(_UUID_TERM.fullmatch(term) or _SEQNO_TERM.fullmatch(term))
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def _tokenize(query: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    query = query.rstrip()
+    while pos < len(query):
+        m = _TOKEN_RE.match(query, pos)
+        if not m or m.end() == pos:
+            raise QuerySyntaxError(f"unexpected input at offset {pos}: {query[pos:pos + 20]!r}")
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "str":
+            text = re.sub(r"\\(.)", r"\1", text[1:-1])
+        tokens.append((kind, text))
+        pos = m.end()
+    return tokens
+
+
+def _normalize(text: str) -> str:
+    return text.lower().replace("\\", "").replace('"', "")
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """Parse a query into its filter in disjunctive normal form.
+
+    Returns a list of alternatives, each a list of normalized `$d ~~` terms
+    that must all match. Several filter stages are ANDed together.
+    """
+    tokens = _tokenize(query)
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos][1] if pos < len(tokens) else None
+
+    def expect(text: str) -> None:
+        nonlocal pos
+        if peek() != text:
+            raise QuerySyntaxError(f"expected {text!r}, got {peek()!r}")
+        pos += 1
+
+    def or_expr() -> List[List[str]]:
+        nonlocal pos
+        alternatives = and_expr()
+        while peek() == "||":
+            pos += 1
+            alternatives = alternatives + and_expr()
+        return alternatives
+
+    def and_expr() -> List[List[str]]:
+        nonlocal pos
+        alternatives = primary()
+        while peek() == "&&":
+            pos += 1
+            right = primary()
+            alternatives = [a + b for a in alternatives for b in right]
+        return alternatives
+
+    def primary() -> List[List[str]]:
+        nonlocal pos
+        if peek() == "(":
+            pos += 1
+            alternatives = or_expr()
+            expect(")")
+            return alternatives
+        expect("$d")
+        expect("~~")
+        if pos >= len(tokens) or tokens[pos][0] != "str":
+            raise QuerySyntaxError(f"expected a string after '~~', got {peek()!r}")
+        term = _normalize(tokens[pos][1])
+        pos += 1
+        return [[term]]
+
+    expect("source")
+    expect("logs")
+    dnf: List[List[str]] = [[]]
+    while pos < len(tokens):
+        expect("|")
+        stage = peek()
+        if stage != "filter":
+            raise QuerySyntaxError(f"unsupported stage {stage!r}")
+        pos += 1
+        # Parsed once; in the comprehension it would be re-parsed for every alternative so far
+        stage_dnf = or_expr()
+        dnf = [a + b for a in dnf for b in stage_dnf]
+    return dnf
+
+
+def _contains_term(text: str, term: str) -> bool:
+    """Free-text match of an already normalized term, on word boundaries."""
+    if not term:
+        return True
+    start = text.find(term)
+    while start != -1:
+        end = start + len(term)
+        if ((start == 0 or not (term[0].isalnum() and text[start - 1].isalnum()))
+                and (end == len(text) or not (term[-1].isalnum() and text[end].isalnum()))):
+            return True
+        start = text.find(term, start + 1)
+    return False
+
+
+def _log_text(log: Dict[str, Any]) -> str:
+    user_data = log.get("userData")
+    return user_data if isinstance(user_data, str) else json.dumps(log, ensure_ascii=False)
+
+
+def _log_time(log: Dict[str, Any]) -> Optional[float]:
+    """The log's timestamp as epoch seconds, from "timestamp" or a metadata entry of that key."""
+    value = log.get("timestamp")
+    if value is None and isinstance(log.get("metadata"), list):
+        for item in log["metadata"]:
+            if isinstance(item, dict) and item.get("key") == "timestamp":
+                value = item.get("value")
+                break
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return parse_datetime(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def load_corpus(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    """Read logs from JSON Lines files: one log per line, or DataPrime NDJSON responses."""
+    logs: List[Dict[str, Any]] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                obj = json.loads(line)
+                if not isinstance(obj, dict) or "queryId" in obj or "warning" in obj:
+                    continue
+                if isinstance(obj.get("result"), dict):
+                    logs.extend(obj["result"].get("results") or [])
+                else:
+                    logs.append(obj)
+    return logs
+
+
+class MockDataPrime:
+    """The query endpoint's behaviour, independent of HTTP.
+
+    Rows are returned in corpus order, limited to the request's
+    metadata.limit (capped at `max_limit`) and split into `chunk_size`-row
+    result lines. Faults are drawn per request from a seeded RNG: a
+    `throttle_rate` share get 429 with Retry-After, an `error_rate` share 500,
+    and every request first waits `latency` plus up to `jitter` seconds.
+    """
+
+    def __init__(self, logs: List[Dict[str, Any]], max_limit: int = QUERY_LIMIT,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, seed: Optional[int] = None,
+                 api_key: Optional[str] = None):
+        self.logs = logs
+        self.max_limit = max_limit
+        self.chunk_size = max(1, chunk_size)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.api_key = api_key
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = defaultdict(int)
+
+        self._texts = [_normalize(_log_text(lg)) for lg in logs]
+        self._times = [_log_time(lg) for lg in logs]
+        # txId, tenant and seqno:N terms are answered from this index instead of a scan of every log
+        self._index: Dict[str, Set[int]] = defaultdict(set)
+        for i, text in enumerate(self._texts):
+            for m in _UUID_SCAN.finditer(text):
+                self._index[m.group(1)].add(i)
+            for m in _SEQNO_TERM.finditer(text):
+                self._index[m.group(0)].add(i)
+
+    def search(self, query: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """All logs in [start_date, end_date) that match the query's filter."""
+        dnf = parse_query(query)
+        start = parse_datetime(start_date).timestamp()
+        end = parse_datetime(end_date).timestamp()
+
+        def in_window(i: int) -> bool:
+            ts = self._times[i]
+            return ts is None or start <= ts < end
+
+        hits = set()
+        scan: List[List[str]] = []
+        empty: Set[int] = set()
+        for terms in dnf:
+            postings = sorted((self._index.get(t, empty) for t in set(terms) if _indexed(t)), key=len)
+            if not postings:
+                scan.append(terms)
+                continue
+            # Index entries are a superset of the matches, so intersect them, smallest first
+            candidates = postings[0].intersection(*postings[1:])
+            for i in candidates:
+                if i not in hits and in_window(i) and all(_contains_term(self._texts[i], t) for t in terms):
+                    hits.add(i)
+        if scan:
+            for i, text in enumerate(self._texts):
+                if i not in hits and in_window(i) and any(all(_contains_term(text, t) for t in terms) for terms in scan):
+                    hits.add(i)
+        return [self.logs[i] for i in sorted(hits)]
+
+    def _draw_fault(self) -> Tuple[float, Optional[int]]:
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def handle(self, body: bytes, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Answer one query request; returns (status, extra headers, body)."""
+        self._count("requests")
+        delay, fault = self._draw_fault()
+        if delay:
+            time.sleep(delay)
+        if self.api_key is not None:
+            auth = headers.get("Authorization", "")
+            if auth != f"Bearer {self.api_key}" and headers.get("X-API-Key") != self.api_key:
+                self._count("status_403")
+                return 403, {}, b'{"error":"invalid api key"}'
+        if fault == 429:
+            self._count("status_429")
+            return 429, {"Retry-After": "1"}, b'{"error":"rate limit exceeded"}'
+        if fault == 500:
+            self._count("status_500")
+            return 500, {}, b'{"error":"injected server error"}'
+
+        try:
+            request = json.loads(body)
+            metadata = request.get("metadata") or {}
+            limit = min(int(metadata.get("limit") or DEFAULT_LIMIT), self.max_limit)
+            query = request["query"]
+            counted = _COUNT_STAGE.search(query)
+            rows = self.search(query[:counted.start()] if counted else query, metadata["startDate"],
+                               metadata["endDate"])
+        except (KeyError, TypeError, ValueError) as e:
+            self._count("status_400")
+            return 400, {}, json.dumps({"error": f"bad query: {e}"}).encode("utf-8")
+
+        if counted:
+            rows = [{"userData": json.dumps({"_count": len(rows)})}]
+        lines = [{"queryId": {"queryId": str(uuid.uuid4())}}]
+        if len(rows) > limit:
+            lines.append({"warning": {"resultsLimitWarning": {"limit": limit, "matched": len(rows)}}})
+            rows = rows[:limit]
+        for start in range(0, len(rows), self.chunk_size):
+            lines.append({"result": {"results": rows[start:start + self.chunk_size]}})
+        if not rows:
+            lines.append({"result": {"results": []}})
+        self._count("status_200")
+        self._count("rows", len(rows))
+        data = "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines)
+        return 200, {}, data.encode("utf-8")
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    mock: MockDataPrime
+    verbose = False
+    # Keep-alive, so pooled sessions reuse connections as they do against Coralogix
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, headers: Dict[str, str], data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlparse(self.path).path != DP_QUERY_PATH:
+            self._send(404, {}, b'{"error":"not found"}', "application/json")
+            return
+        status, headers, data = self.mock.handle(body, dict(self.headers.items()))
+        self._send(status, headers, data, "application/x-ndjson" if status == 200 else "application/json")
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path != "/stats":
+            self._send(404, {}, b'{"error":"not found"}', "application/json")
+            return
+        self._send(200, {}, json.dumps(dict(self.mock.stats)).encode("utf-8"), "application/json")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.verbose:
+            print(f"{self.address_string()} - {format % args}")
+
+
+def start_mock_server(mock: MockDataPrime, host: str = "127.0.0.1", port: int = 0,
+                      verbose: bool = False) -> ThreadingHTTPServer:
+    """Serve `mock` from a background thread; the query URL is query_url(server)."""
+    handler = type("MockHandler", (_MockHandler,), {"mock": mock, "verbose": verbose})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def query_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{DP_QUERY_PATH}"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock DataPrime query endpoint over a log corpus.")
+    parser.add_argument("--corpus", action="append", default=[], metavar="PATH",
+                        help="JSON Lines file of logs or DataPrime NDJSON responses (repeatable)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8089, help="port to listen on (default: 8089)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--max-limit", type=int, default=QUERY_LIMIT,
+                        help=f"cap on rows per query, below the requested limit if smaller (default: {QUERY_LIMIT})")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows per NDJSON result line (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--seed", type=int, help="seed for latency jitter and fault injection")
+    parser.add_argument("--api-key", help="reject requests that don't carry this key with 403")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    logs = load_corpus(args.corpus)
+    mock = MockDataPrime(logs, args.max_limit, args.chunk_size, args.latency, args.jitter,
+                         args.error_rate, args.throttle_rate, args.seed, args.api_key)
+    server = start_mock_server(mock, args.host, args.port, args.verbose)
+    print(f"Serving {len(logs)} logs; set CORALOGIX_DP_URL={query_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Prometheus/OpenMetrics counters and histograms for the long-running modes.
+
+Nothing is recorded until enable() is called (the CLI does so for
+--metrics-port and --metrics-textfile). Until then each instrumented call
+costs a single flag check. Exposition is stdlib only:
+start_metrics_server() serves GET /metrics, and write_textfile() writes the
+node_exporter textfile-collector format.
+"""
+import functools
+import threading
+import time
+import types
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import log
+from .metrics import FALLBACKS, FallbackStats
+from .output import atomic_write
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CPU_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+ENABLED = False
+
+
+def enable() -> None:
+    global ENABLED
+    ENABLED = True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self, family: str) -> List[str]:
+        return [f"# HELP {family} {self.help}", f"# TYPE {family} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter; exposed as <name>_total."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self, openmetrics: bool) -> List[str]:
+        # OpenMetrics names the family without the suffix; the Prometheus text format with it
+        lines = self._header(self.name if openmetrics else f"{self.name}_total")
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}_total{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self, openmetrics: bool) -> List[str]:
+        lines = self._header(self.name)
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self, openmetrics: bool) -> List[str]:
+        lines = self._header(self.name)
+        with self._lock:
+            for labels, counts in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {counts[-2]}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {counts[-2]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(counts[-1])}")
+        return lines
+
+
+class FallbackCounters:
+    """The extractors' FallbackStats as three counter families, read at render time.
+
+    These are always collected (see metrics.FALLBACKS), so they need no enable().
+    """
+
+    FAMILIES = (
+        ("seqno_extract_fallback_attempts", "Times each fallback strategy was tried.", 0),
+        ("seqno_extract_fallback_hits", "Times each fallback strategy found the value.", 1),
+        ("seqno_extract_fallback_seconds", "Time spent in each fallback strategy (0 for the first of each chain).", 2),
+    )
+
+    def __init__(self, stats: FallbackStats):
+        self.stats = stats
+
+    def render(self, openmetrics: bool) -> List[str]:
+        counts = sorted(self.stats.snapshot().items())
+        lines = []
+        for name, help, index in self.FAMILIES:
+            family = name if openmetrics else f"{name}_total"
+            lines += [f"# HELP {family} {help}", f"# TYPE {family} counter"]
+            for labels, values in counts:
+                lines.append(f"{name}_total{_labels(('field', 'strategy'), labels)} {_number(values[index])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def register(self, metric: Any) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, openmetrics: bool = True) -> str:
+        lines = [line for metric in self._metrics for line in metric.render(openmetrics)]
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+DATAPRIME_REQUESTS = REGISTRY.register(Counter(
+    "seqno_dataprime_requests", "DataPrime queries by HTTP status code (error: no response).", ("code",)))
+DATAPRIME_SECONDS = REGISTRY.register(Histogram(
+    "seqno_dataprime_request_seconds", "DataPrime query latency, including the wait for a concurrency slot.",
+    LATENCY_BUCKETS))
+EXTRACT_LOGS = REGISTRY.register(Counter(
+    "seqno_extract_logs", "Logs scanned by each extractor.", ("extractor",)))
+EXTRACT_ROWS = REGISTRY.register(Counter(
+    "seqno_extract_rows", "Rows (seqnos, pairs, txIds, sourceIds) produced by each extractor.", ("extractor",)))
+EXTRACT_SECONDS = REGISTRY.register(Histogram(
+    "seqno_extract_seconds", "Time spent in each extractor call.", CPU_BUCKETS, ("extractor",)))
+STATUS_RECORDS = REGISTRY.register(Counter(
+    "seqno_status_records", "Records assigned a status by the status engine.", ("status",)))
+STATUS_SECONDS = REGISTRY.register(Histogram(
+    "seqno_status_seconds", "Time spent in each status engine call.", CPU_BUCKETS))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "seqno_lookup_cache_requests", "Lookup service cache lookups by result (hit or miss).", ("result",)))
+UNRESOLVED_TXIDS = REGISTRY.register(Gauge(
+    "seqno_unresolved_txids", "txIds the watcher is still waiting on a verdict for."))
+WATCH_POLLS = REGISTRY.register(Counter(
+    "seqno_watch_polls", "Watch polls by result (ok or error).", ("result",)))
+REGISTRY.register(FallbackCounters(FALLBACKS))
+
+
+def observe_request(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Count a DataPrime request call by status code and time it."""
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not ENABLED:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        code = "200"
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            # requests exceptions carry the response; anything else never got one
+            code = str(getattr(getattr(e, "response", None), "status_code", None) or "error")
+            raise
+        finally:
+            DATAPRIME_SECONDS.observe(time.perf_counter() - start)
+            DATAPRIME_REQUESTS.inc(1, code)
+    return wrapper
+
+
+def observe_extractor(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Count the logs in and rows out of an extractor, which may be a generator, and time it."""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(logs: List[Dict[str, Any]], *args: Any, **kwargs: Any) -> Any:
+            if not ENABLED:
+                return fn(logs, *args, **kwargs)
+            start = time.perf_counter()
+            result = fn(logs, *args, **kwargs)
+            if isinstance(result, types.GeneratorType):
+                return _counted(result, name, len(logs), start)
+            _record_extract(name, len(logs), len(result), time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorate
+
+
+def _counted(items: Iterator[Any], name: str, logs: int, start: float) -> Iterator[Any]:
+    rows = 0
+    for item in items:
+        rows += 1
+        yield item
+    _record_extract(name, logs, rows, time.perf_counter() - start)
+
+
+def _record_extract(name: str, logs: int, rows: int, elapsed: float) -> None:
+    EXTRACT_LOGS.inc(logs, name)
+    EXTRACT_ROWS.inc(rows, name)
+    EXTRACT_SECONDS.observe(elapsed, name)
+
+
+def observe_status(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Time a status engine call and count the statuses it assigned to its records."""
+    @functools.wraps(fn)
+    def wrapper(records: List[Any], *args: Any, **kwargs: Any) -> Any:
+        if not ENABLED:
+            return fn(records, *args, **kwargs)
+        start = time.perf_counter()
+        result = fn(records, *args, **kwargs)
+        STATUS_SECONDS.observe(time.perf_counter() - start)
+        counts: Dict[str, int] = {}
+        for rec in records:
+            counts[rec.status] = counts.get(rec.status, 0) + 1
+        for status, count in counts.items():
+            STATUS_RECORDS.inc(count, status)
+        return result
+    return wrapper
+
+
+def write_textfile(path: str, registry: Registry = REGISTRY) -> None:
+    """Write the metrics for node_exporter's textfile collector (path should end in .prom)."""
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        f.write(registry.render(openmetrics=False))
+
+
+def start_metrics_server(host: str, port: int, registry: Optional[Registry] = None) -> "ThreadingHTTPServer":
+    """Serve GET /metrics from a daemon thread; OpenMetrics when the scraper asks for it."""
+    # Imported here so http.server stays off the package import path
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            data = registry.render(openmetrics).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info("Serving metrics on http://%s:%s/metrics", host, server.server_port)
+    return server
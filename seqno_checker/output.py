@@ -0,0 +1,359 @@
+"""Result writers (CSV, SQLite, columnar, JSON Lines) and the matching readers."""
+import contextlib
+import csv
+import json
+import os
+import stat
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from . import log
+from .ids import SourceKey, decode_source_id, decode_txid, encode_source_id, encode_txid
+from .records import (
+    CSV_FIELDNAMES, SEQNO_FIELD, SOURCEID_FIELD, STATUS_FIELD, TXID_FIELD, TxRecord, record_from_row, record_to_row,
+)
+from .timeutil import format_utc
+
+
+def _create_temp(path: str) -> Tuple[int, str]:
+    """Create a uniquely named temp file next to `path`, with the mode a plain open() would give it.
+
+    Unlike mkstemp's 0600, mode 0666 lets the umask (and any default ACL)
+    apply as usual, without reading the umask, which is process-global and
+    racy to read from threads.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for _ in range(100):
+        tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(tmp_path, flags, 0o666), tmp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"no free temporary file name next to {path}")
+
+
+@contextlib.contextmanager
+def atomic_write(path: str, mode: str = "w", **kwargs):
+    """Open a temp file next to `path` and rename it over `path` on success.
+
+    Readers see either the old file or the complete new one, never a partial write.
+    """
+    fd, tmp_path = _create_temp(path)
+    try:
+        f = os.fdopen(fd, mode, **kwargs)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    try:
+        with f:
+            # An existing file keeps its mode
+            with contextlib.suppress(FileNotFoundError):
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_csv_records(path: str, records: List[TxRecord]) -> None:
+    with atomic_write(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CSV_FIELDNAMES)
+        w.writerows(
+            (rec.seqno, decode_txid(rec.txid), decode_source_id(rec.source_id), rec.status)
+            for rec in records
+        )
+
+
+def write_csv(records: List[TxRecord], path: str) -> None:
+    if not records:
+        log.info("No rows to write. Skipping CSV.")
+        return
+    _write_csv_records(path, records)
+    log.info("Wrote %d rows to %s", len(records), path)
+
+
+def read_csv(path: str) -> List[TxRecord]:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return [record_from_row(row) for row in csv.DictReader(f)]
+
+
+def append_csv(records: List[TxRecord], path: str) -> None:
+    """Append rows to a results CSV, writing the header if the file is new."""
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if new_file:
+            w.writerow(CSV_FIELDNAMES)
+        w.writerows(
+            (rec.seqno, decode_txid(rec.txid), decode_source_id(rec.source_id), rec.status)
+            for rec in records
+        )
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tx_records (
+    seqno      INTEGER NOT NULL,
+    tx_id      TEXT    NOT NULL,
+    source_id  TEXT    NOT NULL,
+    status     TEXT    NOT NULL,
+    updated_at TEXT    NOT NULL,
+    UNIQUE (tx_id, seqno)
+);
+CREATE INDEX IF NOT EXISTS idx_tx_records_source_seqno ON tx_records (source_id, seqno);
+CREATE INDEX IF NOT EXISTS idx_tx_records_status ON tx_records (status, source_id);
+"""
+
+
+def write_sqlite(records: List[TxRecord], path: str) -> None:
+    """Upsert records into an SQLite database in a single transaction.
+
+    Rows are keyed by (txId, seqno), so re-running an investigation updates
+    sourceIds and statuses in place. The unique key also serves txId lookups.
+    """
+    if not records:
+        log.info("No rows to write. Skipping SQLite.")
+        return
+    import sqlite3
+
+    updated_at = format_utc(datetime.now(timezone.utc))
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SQLITE_SCHEMA)
+        with conn:
+            conn.executemany(
+                "INSERT INTO tx_records (seqno, tx_id, source_id, status, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (tx_id, seqno) DO UPDATE SET "
+                "source_id = excluded.source_id, status = excluded.status, updated_at = excluded.updated_at",
+                (
+                    (rec.seqno, decode_txid(rec.txid), decode_source_id(rec.source_id), rec.status, updated_at)
+                    for rec in records
+                ),
+            )
+    finally:
+        conn.close()
+    log.info("Wrote %d rows to %s", len(records), path)
+
+
+# Columnar export. Parquet is used when pyarrow is installed; otherwise the
+# built-in SQCOL format, a stream of self-contained little-endian row groups:
+#   MAGIC, then per group: u32 n_rows, u32 meta_len, meta (JSON), column blobs
+# meta lists the per-group sourceId/status dictionaries, the txId encoding
+# ("uuid128": u64 hi + u64 lo arrays, or "utf8": u32 end offsets + bytes),
+# the byte length of each blob and its fixed-width type ("types"). seqno is
+# i64, sourceId u32 codes, status u8.
+SQCOL_MAGIC = b"SQCOL01\n"
+COLUMNAR_ROW_GROUP_SIZE = 65536
+_PARQUET_MAGIC = b"PAR1"
+# Column type -> (bytes per item, signed)
+_SQCOL_TYPES = {"i64": (8, True), "u64": (8, False), "u32": (4, False), "u8": (1, False)}
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _typecode(sqcol_type: str) -> str:
+    """The array typecode with the column type's exact width; C type sizes vary between platforms."""
+    size, signed = _SQCOL_TYPES[sqcol_type]
+    for code in ("bhilq" if signed else "BHILQ"):
+        if array(code).itemsize == size:
+            return code
+    raise ValueError(f"no {size}-byte integer array type on this platform")
+
+
+def _le_bytes(sqcol_type: str, values: Iterable[int]) -> bytes:
+    arr = array(_typecode(sqcol_type), values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _le_array(sqcol_type: str, data: bytes) -> array:
+    arr = array(_typecode(sqcol_type))
+    if len(data) % arr.itemsize:
+        raise ValueError(f"SQCOL {sqcol_type} column of {len(data)} bytes is truncated")
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _sqcol_row_group(chunk: List[TxRecord]) -> bytes:
+    source_dict: Dict[SourceKey, int] = {}
+    status_dict: Dict[str, int] = {}
+    sources = [source_dict.setdefault(rec.source_id, len(source_dict)) for rec in chunk]
+    statuses = [status_dict.setdefault(rec.status, len(status_dict)) for rec in chunk]
+    if all(isinstance(rec.txid, int) for rec in chunk):
+        tx_encoding = "uuid128"
+        tx_types = ["u64", "u64"]
+        tx_blobs = [
+            _le_bytes("u64", (rec.txid >> 64 for rec in chunk)),
+            _le_bytes("u64", (rec.txid & 0xFFFFFFFFFFFFFFFF for rec in chunk)),
+        ]
+    else:
+        tx_encoding = "utf8"
+        tx_types = ["u32", "utf8"]
+        encoded = [decode_txid(rec.txid).encode("utf-8") for rec in chunk]
+        offsets = []
+        end = 0
+        for b in encoded:
+            end += len(b)
+            offsets.append(end)
+        tx_blobs = [_le_bytes("u32", offsets), b"".join(encoded)]
+    blobs = [_le_bytes("i64", (rec.seqno for rec in chunk)), *tx_blobs, _le_bytes("u32", sources),
+             _le_bytes("u8", statuses)]
+    meta = json.dumps({
+        "sources": [decode_source_id(k) for k in source_dict],
+        "statuses": list(status_dict),
+        "txid": tx_encoding,
+        "lengths": [len(b) for b in blobs],
+        "types": ["i64", *tx_types, "u32", "u8"],
+    }, separators=(",", ":")).encode("utf-8")
+    return struct.pack("<II", len(chunk), len(meta)) + meta + b"".join(blobs)
+
+
+def _write_parquet(pa, f, records: List[TxRecord]) -> None:
+    schema = pa.schema([
+        (SEQNO_FIELD, pa.int64()),
+        (TXID_FIELD, pa.string()),
+        (SOURCEID_FIELD, pa.dictionary(pa.int32(), pa.string())),
+        (STATUS_FIELD, pa.dictionary(pa.int8(), pa.string())),
+    ])
+    with pa.parquet.ParquetWriter(f, schema, compression="zstd") as writer:
+        for start in range(0, len(records), COLUMNAR_ROW_GROUP_SIZE):
+            chunk = records[start:start + COLUMNAR_ROW_GROUP_SIZE]
+            writer.write_table(pa.table([
+                pa.array([rec.seqno for rec in chunk], pa.int64()),
+                pa.array([decode_txid(rec.txid) for rec in chunk], pa.string()),
+                pa.array([decode_source_id(rec.source_id) for rec in chunk], pa.string()).dictionary_encode(),
+                pa.array([rec.status for rec in chunk], pa.string()).dictionary_encode().cast(schema.field(3).type),
+            ], schema=schema))
+
+
+def write_columnar(records: List[TxRecord], path: str, fmt: Optional[str] = None) -> None:
+    """Write records in a columnar format, one row group at a time.
+
+    fmt is "parquet" or "sqcol"; by default Parquet is used when pyarrow is
+    installed and SQCOL otherwise.
+    """
+    if not records:
+        log.info("No rows to write. Skipping columnar output.")
+        return
+    pa = _load_pyarrow() if fmt in (None, "parquet") else None
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow).")
+    with atomic_write(path, "wb") as f:
+        if pa is not None:
+            fmt = "parquet"
+            _write_parquet(pa, f, records)
+        else:
+            fmt = "sqcol"
+            f.write(SQCOL_MAGIC)
+            for start in range(0, len(records), COLUMNAR_ROW_GROUP_SIZE):
+                f.write(_sqcol_row_group(records[start:start + COLUMNAR_ROW_GROUP_SIZE]))
+    log.info("Wrote %d rows to %s (%s)", len(records), path, fmt)
+
+
+def _read_sqcol(f) -> List[TxRecord]:
+    records: List[TxRecord] = []
+    while True:
+        header = f.read(8)
+        if not header:
+            break
+        n_rows, meta_len = struct.unpack("<II", header)
+        meta = json.loads(f.read(meta_len))
+        blobs = [f.read(n) for n in meta["lengths"]]
+        if any(len(b) != n for b, n in zip(blobs, meta["lengths"])):
+            raise ValueError("SQCOL file is truncated")
+        types = meta.get("types")
+        if types is None:
+            raise ValueError("SQCOL row group has no column types")
+        seqnos = _le_array(types[0], blobs[0])
+        if meta["txid"] == "uuid128":
+            hi, lo = _le_array(types[1], blobs[1]), _le_array(types[2], blobs[2])
+            txids = [(h << 64) | l for h, l in zip(hi, lo)]
+        else:
+            offsets, data = _le_array(types[1], blobs[1]), blobs[2]
+            txids, prev = [], 0
+            for end in offsets:
+                txids.append(encode_txid(data[prev:end].decode("utf-8")))
+                prev = end
+        sources = [encode_source_id(v) for v in meta["sources"]]
+        statuses = [sys.intern(v) for v in meta["statuses"]]
+        src_codes, status_codes = _le_array(types[-2], blobs[-2]), _le_array(types[-1], blobs[-1])
+        if not len(seqnos) == len(txids) == len(src_codes) == len(status_codes) == n_rows:
+            raise ValueError(f"SQCOL row group of {n_rows} rows has columns of other lengths")
+        records.extend(
+            TxRecord(seq, tx, sources[sc], statuses[st])
+            for seq, tx, sc, st in zip(seqnos, txids, src_codes, status_codes)
+        )
+    return records
+
+
+def read_columnar(path: str) -> List[TxRecord]:
+    """Load records written by write_columnar (either format)."""
+    with open(path, "rb") as f:
+        magic = f.read(len(SQCOL_MAGIC))
+        if magic == SQCOL_MAGIC:
+            return _read_sqcol(f)
+    if not magic.startswith(_PARQUET_MAGIC):
+        raise ValueError(f"{path} is not a Parquet or SQCOL file")
+    pa = _load_pyarrow()
+    if pa is None:
+        raise RuntimeError("Reading Parquet requires pyarrow (pip install pyarrow).")
+    cols = pa.parquet.read_table(path).to_pydict()
+    return [
+        TxRecord(seq, encode_txid(tx), encode_source_id(src), sys.intern(st))
+        for seq, tx, src, st in zip(cols[SEQNO_FIELD], cols[TXID_FIELD], cols[SOURCEID_FIELD], cols[STATUS_FIELD])
+    ]
+
+
+class JsonlEmitter:
+    """Streams results as JSON Lines, one event per line, flushed immediately.
+
+    Events are "pair" (a new seqno/txId pair), "status" (a record whose
+    sourceId or status changed) and a final "done" with the status counts.
+    Each line carries the same fields as a CSV row plus "event".
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._last: Dict[int, tuple] = {}
+
+    def _write(self, obj: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(obj, separators=(",", ":")) + "\n")
+        self.stream.flush()
+
+    def emit(self, event: str, rec: TxRecord) -> None:
+        self._last[id(rec)] = (rec.source_id, rec.status)
+        self._write({"event": event, **record_to_row(rec)})
+
+    def emit_changes(self, records: List[TxRecord]) -> None:
+        for rec in records:
+            if self._last.get(id(rec)) != (rec.source_id, rec.status):
+                self.emit("status", rec)
+
+    def done(self, records: List[TxRecord]) -> None:
+        counts: Dict[str, int] = {}
+        for rec in records:
+            counts[rec.status] = counts.get(rec.status, 0) + 1
+        self._write({"event": "done", "rows": len(records), "statuses": counts})
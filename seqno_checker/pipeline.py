@@ -0,0 +1,396 @@
+"""The four-query investigation pipeline and --recheck."""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import log
+from .checkpoint import Checkpoint
+from .client import QUERY_LIMIT, DataPrimeClient, request_dataprime
+from .config import DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY, DEFAULT_OUTPUT_CSV, DEFAULT_VECTORIZE_MIN_ROWS, Config
+from .extract import (
+    extract_completed_txids, extract_logs_from_response, extract_pairs_seqno_txid, extract_seqnos_from_logs,
+    extract_source_ids, iter_pairs_seqno_txid,
+)
+from .ids import SourceKey, TxKey, UNKNOWN_SOURCE, decode_source_id, decode_txid, encode_source_id, encode_txid
+from .metrics import RunMetrics, StageMetrics, timer
+from .output import JsonlEmitter, read_csv, write_columnar, write_csv, write_sqlite
+from .queries import build_first_query, build_fourth_query, build_second_query, build_third_query
+from .records import TxRecord
+from .status import apply_status, print_status_summary
+from .timeutil import format_utc, parse_datetime
+from .tracing import bind, span
+
+MIN_SPLIT_WINDOW = timedelta(minutes=1)
+# How far before the last check a --recheck window starts, to allow for ingestion lag
+RECHECK_OVERLAP = timedelta(minutes=10)
+
+
+class NoSeqnosFound(Exception):
+    """The first query found no seqno for any of the txIds, so there is nothing to check."""
+
+
+class QueryFailed(Exception):
+    """A stage's DataPrime query failed and the run can't continue without it.
+
+    `exit_code` is the CLI's exit status for the stage (3 for the first
+    query, 4 for the second, 3 for a recheck's completion query).
+    """
+
+    def __init__(self, message: str, stage: str, exit_code: int):
+        super().__init__(message)
+        self.stage = stage
+        self.exit_code = exit_code
+
+
+def describe_request_error(e: Exception, stage: str = "") -> str:
+    """One-line description of a failed query, with the response body for HTTP errors."""
+    where = f" ({stage})" if stage else ""
+    # requests exceptions carry the response; reading it here keeps requests out of the import path
+    response = getattr(e, "response", None)
+    if response is not None:
+        return f"HTTP error from DataPrime{where}: {e} - {getattr(response, 'text', '')}"
+    return f"Request error{where}: {e}"
+
+
+def query_logs(query: str, start_date: str, end_date: str, client: DataPrimeClient,
+               stats: Optional[StageMetrics] = None) -> List[Dict[str, Any]]:
+    """Run one query, splitting the window in half while results hit QUERY_LIMIT."""
+    with span("query_logs", **{"dataprime.window.start": start_date, "dataprime.window.end": end_date}) as sp:
+        logs = extract_logs_from_response(request_dataprime(query, start_date, end_date, client, stats))
+        sp.set("logs", len(logs))
+        if len(logs) < QUERY_LIMIT:
+            return logs
+        start_dt, end_dt = parse_datetime(start_date), parse_datetime(end_date)
+        if end_dt - start_dt <= MIN_SPLIT_WINDOW:
+            log.warning("Warning: %d logs in %s to %s; results may be truncated.", len(logs), start_date, end_date)
+            sp.set("truncated", True)
+            return logs
+        mid_date = format_utc(start_dt + (end_dt - start_dt) / 2)
+        log.info("Query hit the %d-row limit; splitting window at %s", QUERY_LIMIT, mid_date)
+        sp.set("split_at", mid_date)
+        return (query_logs(query, start_date, mid_date, client, stats)
+                + query_logs(query, mid_date, end_date, client, stats))
+
+
+def fetch_logs(build_query: Callable[[List[Any]], str], items: List[Any], start_date: str, end_date: str,
+               client: DataPrimeClient, batch_size: int = DEFAULT_BATCH_SIZE,
+               concurrency: int = DEFAULT_CONCURRENCY, stats: Optional[StageMetrics] = None) -> List[Dict[str, Any]]:
+    """Build one query per batch of `items` and run them, `concurrency` at a time."""
+    with timer(stats, "wall_sec"):
+        with timer(stats, "build_sec"):
+            queries = [build_query(items[i:i + batch_size]) for i in range(0, len(items), batch_size)]
+        if len(queries) == 1 or concurrency <= 1:
+            # In the calling thread, where --profile can see it
+            logs = [lg for q in queries for lg in query_logs(q, start_date, end_date, client, stats)]
+        else:
+            # Imported here so concurrent.futures (and the logging it pulls in) stays off the import path
+            from concurrent.futures import ThreadPoolExecutor
+
+            log.info("Running %d batched queries, %s at a time...", len(queries), concurrency)
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                # bind() keeps the stage span as the parent of the workers' spans
+                results = pool.map(bind(lambda q: query_logs(q, start_date, end_date, client, stats)), queries)
+                logs = [lg for batch in results for lg in batch]
+    if stats:
+        stats.add(logs=len(logs))
+    return logs
+
+
+def run(params: Dict[str, Any], client: DataPrimeClient, config: Optional[Config] = None,
+        emitter: Optional[JsonlEmitter] = None, resume: bool = True,
+        output_path: str = DEFAULT_OUTPUT_CSV, metrics: Optional[RunMetrics] = None) -> None:
+    """Run the four queries for params from make_params() and write output_path.
+
+    Raises NoSeqnosFound when the first query finds nothing and QueryFailed
+    when the first or second query fails. Failures of the third and fourth
+    queries are logged, and the run continues without them.
+    """
+    config = config or Config()
+    metrics = metrics or RunMetrics()
+    tx_ids: List[str] = params["tx_ids"]
+    tenant_id: str = params["tenant_id"]
+    start_date: str = params["after_date"]
+    end_date: str = params["before_date"]
+    batch_size, concurrency = config.batch_size, config.concurrency
+
+    checkpoint = Checkpoint.for_run(tx_ids, tenant_id, start_date, end_date, fresh=not resume,
+                                    directory=config.checkpoint_dir)
+
+    stats = metrics.stage("seqnos")
+    seqnos = checkpoint.get("seqnos")
+    if seqnos is not None:
+        stats.resumed = True
+        log.info("\nResuming run %s: %d seqno values from checkpoint.", checkpoint.run_id, len(seqnos))
+    else:
+        # Steps 2-3: Build the first query(s) and query Coralogix DataPrime
+        log.info("\nRunning first query (seqno discovery)...")
+        try:
+            logs1 = fetch_logs(build_first_query, tx_ids, start_date, end_date, client, batch_size, concurrency,
+                               stats)
+        except Exception as e:
+            raise QueryFailed(describe_request_error(e, "first query"), "seqnos", 3) from e
+
+        log.info("Fetched %d logs from first query.", len(logs1))
+
+        # Step 4: Extract seqnos
+        with stats.timer("extract_sec", "wall_sec"):
+            seqnos = extract_seqnos_from_logs(logs1)
+        log.info("Discovered %d unique seqno values.", len(seqnos))
+        checkpoint.save("seqnos", seqnos)
+    stats.add(rows=len(seqnos))
+
+    if not seqnos:
+        checkpoint.clear()
+        raise NoSeqnosFound("No seqno values found.")
+
+    stats = metrics.stage("pairs")
+    saved_pairs = checkpoint.get("pairs")
+    if saved_pairs is not None:
+        stats.resumed = True
+        pairs = [TxRecord(seq, encode_txid(tx)) for seq, tx in saved_pairs]
+        log.info("Loaded %d seqno/txId pairs from checkpoint.", len(pairs))
+        if emitter:
+            for pair in pairs:
+                emitter.emit("pair", pair)
+    else:
+        # Steps 5-6: Build the second query(s) and query again
+        log.info("\nRunning second query (tenant + seqno)...")
+        try:
+            logs2 = fetch_logs(lambda batch: build_second_query(tenant_id, batch), seqnos,
+                               start_date, end_date, client, batch_size, concurrency, stats)
+        except Exception as e:
+            raise QueryFailed(describe_request_error(e, "second query"), "pairs", 4) from e
+
+        log.info("Fetched %d logs from second query.", len(logs2))
+
+        # Step 7: Extract pairs
+        pairs = []
+        with stats.timer("extract_sec", "wall_sec"):
+            for pair in iter_pairs_seqno_txid(logs2):
+                pairs.append(pair)
+                if emitter:
+                    emitter.emit("pair", pair)
+        log.info("Extracted %d seqno/txId pairs.", len(pairs))
+        checkpoint.save("pairs", [[pair.seqno, decode_txid(pair.txid)] for pair in pairs])
+    stats.add(rows=len(pairs))
+
+    # Extract all txIds from pairs for the third and fourth queries
+    all_txids = [decode_txid(pair.txid) for pair in pairs]
+    completed_txids: Optional[List[TxKey]] = None
+    sourceid_mapping: Optional[Dict[TxKey, SourceKey]] = None
+
+    # Step 8: Third query - Check completion status
+    stats = metrics.stage("completed")
+    saved_completed = checkpoint.get("completed") if pairs else None
+    if saved_completed is not None:
+        stats.resumed = True
+        completed_txids = [encode_txid(tx) for tx in saved_completed]
+        log.info("Loaded %d completed transaction IDs from checkpoint.", len(completed_txids))
+    elif pairs:
+        log.info("\nRunning third query (completion status check)...")
+        log.debug("Note: If no logs are found, the query format might need adjustment "
+                  "based on your Coralogix data structure.")
+        
+        try:
+            logs3 = fetch_logs(build_third_query, all_txids, start_date, end_date, client, batch_size, concurrency,
+                               stats)
+        except Exception as e:
+            log.error(describe_request_error(e, "third query"))
+            log.info("Continuing without completion status check...")
+        else:
+            log.info("Fetched %d logs from third query.", len(logs3))
+            
+            if logs3:
+                log.debug("Sample log from third query: %s", logs3[0])
+            
+            # Extract completed txIds
+            with stats.timer("extract_sec", "wall_sec"):
+                completed_txids = extract_completed_txids(logs3)
+            log.info("Found %d completed transaction IDs.", len(completed_txids))
+            checkpoint.save("completed", [decode_txid(tx) for tx in completed_txids])
+
+    if completed_txids is not None:
+        stats.add(rows=len(completed_txids))
+        if emitter:
+            # Completed verdicts don't depend on sourceIds, so send them now
+            completed_set = set(completed_txids)
+            for pair in pairs:
+                if pair.txid in completed_set:
+                    pair.status = "Completed"
+            emitter.emit_changes(pairs)
+
+        # Step 9: Fourth query - Extract sourceId information
+        stats = metrics.stage("sourceids")
+        saved_sources = checkpoint.get("sourceids")
+        if saved_sources is not None:
+            stats.resumed = True
+            sourceid_mapping = {encode_txid(tx): encode_source_id(src) for tx, src in saved_sources.items()}
+            log.info("Loaded sourceId for %d transaction IDs from checkpoint.", len(sourceid_mapping))
+        else:
+            log.info("\nRunning fourth query (sourceId extraction)...")
+            
+            try:
+                logs4 = fetch_logs(build_fourth_query, all_txids, start_date, end_date, client, batch_size,
+                                   concurrency, stats)
+            except Exception as e:
+                log.error(describe_request_error(e, "fourth query"))
+                log.info("Continuing without sourceId extraction...")
+            else:
+                log.info("Fetched %d logs from fourth query.", len(logs4))
+                
+                if logs4:
+                    log.debug("Sample log from fourth query: %s", logs4[0])
+                
+                # Extract sourceId mapping
+                with stats.timer("extract_sec", "wall_sec"):
+                    sourceid_mapping = extract_source_ids(logs4)
+                log.info("Found sourceId for %d transaction IDs.", len(sourceid_mapping))
+                checkpoint.save("sourceids", {
+                    decode_txid(tx): decode_source_id(src) for tx, src in sourceid_mapping.items()
+                })
+
+        if sourceid_mapping is not None:
+            stats.add(rows=len(sourceid_mapping))
+
+        # Fill in sourceId and status on the in-memory records
+        if not completed_txids:
+            log.info("No completed transaction IDs found. All statuses remain Unknown.")
+        stats = metrics.stage("status")
+        with stats.timer("wall_sec"):
+            apply_status(pairs, completed_txids, sourceid_mapping or {}, config.vectorize_min_rows)
+        stats.add(rows=len(pairs))
+        print_status_summary(pairs)
+        if emitter:
+            emitter.emit_changes(pairs)
+
+    # Step 10: Write the final CSV once
+    stats = metrics.stage("write")
+    with stats.timer("wall_sec"):
+        write_outputs(pairs, output_path, config)
+    stats.add(rows=len(pairs))
+    if emitter:
+        emitter.done(pairs)
+    # Keep the checkpoint if a stage failed, so a rerun only retries that stage
+    if not pairs or sourceid_mapping is not None:
+        checkpoint.clear()
+
+
+def write_outputs(records: List[TxRecord], csv_path: str, config: Config) -> None:
+    write_csv(records, csv_path)
+    if config.sqlite_path:
+        write_sqlite(records, config.sqlite_path)
+    if config.columnar_path:
+        write_columnar(records, config.columnar_path)
+
+
+def recheck_window(csv_path: str, since: Optional[str] = None) -> Tuple[str, str]:
+    """From `since`, or the CSV's modification time minus RECHECK_OVERLAP, until now."""
+    if since:
+        start_dt = parse_datetime(since)
+    else:
+        start_dt = datetime.fromtimestamp(os.path.getmtime(csv_path), timezone.utc) - RECHECK_OVERLAP
+    return format_utc(start_dt), format_utc(datetime.now(timezone.utc))
+
+
+def recheck(csv_path: str, client: DataPrimeClient, config: Optional[Config] = None, since: Optional[str] = None,
+            emitter: Optional[JsonlEmitter] = None, metrics: Optional[RunMetrics] = None) -> None:
+    """Re-query completion and sourceId only for rows that are still Unknown.
+
+    The query window runs from the last check time (the CSV's modification
+    time minus RECHECK_OVERLAP, unless `since` is given) until now. Results
+    are merged into the existing rows and the CSV is rewritten in place.
+    Raises QueryFailed when the completion query fails.
+    """
+    config = config or Config()
+    metrics = metrics or RunMetrics()
+    batch_size, concurrency = config.batch_size, config.concurrency
+    records = read_csv(csv_path)
+    pending = [rec for rec in records if rec.status == "Unknown"]
+    log.info("Loaded %d rows from %s; %d still Unknown.", len(records), csv_path, len(pending))
+    if not pending:
+        log.info("Nothing to recheck.")
+        return
+
+    start_date, end_date = recheck_window(csv_path, since)
+    log.info("Recheck window: %s to %s", start_date, end_date)
+
+    completed = {rec.txid for rec in records if rec.status == "Completed"}
+    sourceid_mapping = {rec.txid: rec.source_id for rec in records if rec.source_id != UNKNOWN_SOURCE}
+
+    pending_txids = [decode_txid(rec.txid) for rec in pending]
+    log.info("\nRunning completion status check for Unknown rows...")
+    stats = metrics.stage("completed")
+    try:
+        logs3 = fetch_logs(build_third_query, pending_txids, start_date, end_date, client, batch_size, concurrency,
+                           stats)
+    except Exception as e:
+        raise QueryFailed(describe_request_error(e, "third query"), "completed", 3) from e
+    with stats.timer("extract_sec", "wall_sec"):
+        newly_completed = set(extract_completed_txids(logs3)) - completed
+    stats.add(rows=len(newly_completed))
+    completed.update(newly_completed)
+    log.info("Found %d newly completed transaction IDs.", len(newly_completed))
+
+    missing_source = [decode_txid(rec.txid) for rec in pending if rec.source_id == UNKNOWN_SOURCE]
+    if missing_source:
+        log.info("\nRunning sourceId extraction for rows without a sourceId...")
+        stats = metrics.stage("sourceids")
+        try:
+            logs4 = fetch_logs(build_fourth_query, missing_source, start_date, end_date, client, batch_size,
+                               concurrency, stats)
+        except Exception as e:
+            log.error(describe_request_error(e, "fourth query"))
+            log.info("Continuing without sourceId extraction...")
+        else:
+            with stats.timer("extract_sec", "wall_sec"):
+                new_sources = extract_source_ids(logs4)
+            stats.add(rows=len(new_sources))
+            log.info("Found sourceId for %d transaction IDs.", len(new_sources))
+            sourceid_mapping.update(new_sources)
+
+    if emitter:
+        for rec in records:
+            emitter.emit("pair", rec)
+    stats = metrics.stage("status")
+    with stats.timer("wall_sec"):
+        apply_status(records, list(completed), sourceid_mapping, config.vectorize_min_rows)
+    stats.add(rows=len(records))
+    print_status_summary(records)
+    if emitter:
+        emitter.emit_changes(records)
+
+    # Always rewrite, so the file's mtime records this check
+    stats = metrics.stage("write")
+    with stats.timer("wall_sec"):
+        write_outputs(records, csv_path, config)
+    stats.add(rows=len(records))
+    if emitter:
+        emitter.done(records)
+
+
+def investigate(tx_ids: List[str], tenant_id: str, start_date: str, end_date: str, client: DataPrimeClient,
+                batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                vectorize_min_rows: int = DEFAULT_VECTORIZE_MIN_ROWS) -> List[TxRecord]:
+    """Run the four queries in memory and return the txIds' siblings with statuses.
+
+    Unlike run(), nothing is checkpointed or written, and query errors propagate.
+    """
+    seqnos = extract_seqnos_from_logs(
+        fetch_logs(build_first_query, tx_ids, start_date, end_date, client, batch_size, concurrency)
+    )
+    if not seqnos:
+        return []
+    pairs = extract_pairs_seqno_txid(fetch_logs(
+        lambda batch: build_second_query(tenant_id, batch), seqnos, start_date, end_date, client, batch_size, concurrency,
+    ))
+    if not pairs:
+        return []
+    all_txids = [decode_txid(pair.txid) for pair in pairs]
+    completed = extract_completed_txids(
+        fetch_logs(build_third_query, all_txids, start_date, end_date, client, batch_size, concurrency)
+    )
+    sourceid_mapping = extract_source_ids(
+        fetch_logs(build_fourth_query, all_txids, start_date, end_date, client, batch_size, concurrency)
+    )
+    apply_status(pairs, completed, sourceid_mapping, vectorize_min_rows)
+    return pairs
@@ -0,0 +1,244 @@
+"""
+--plan: the DataPrime requests a run or --recheck would send, without sending them.
+
+Each stage's queries are built with the same build_*_query functions and
+batching the pipeline uses. Only the first stage of a run (and both stages
+of a recheck) has known inputs. Later stages depend on what earlier ones
+find, so they are built from stand-in values. They assume one seqno per
+input txId and `group_size` txIds per seqno, unless a checkpoint of the run
+already holds their inputs.
+
+query_logs splits a window in half while a query hits QUERY_LIMIT rows, so
+the request count depends on how many logs each query matches. Without a
+probe that is assumed to be one log per txId or seqno. When a client is
+given, each query with known inputs is sent once with a `| count` stage
+appended, which returns a single row. Probes scan the same window as the real query, so
+they cost scan quota, but they download almost nothing.
+
+Scan volume is reported as window-hours: the sum over requests of the width
+of the window each one searches.
+"""
+import itertools
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .checkpoint import Checkpoint
+from .client import QUERY_LIMIT, DataPrimeClient, request_dataprime
+from .config import Config
+from .extract import extract_logs_from_response
+from .ids import UNKNOWN_SOURCE, decode_txid
+from .output import read_csv
+from .pipeline import MIN_SPLIT_WINDOW, recheck_window
+from .queries import build_first_query, build_fourth_query, build_second_query, build_third_query
+from .timeutil import parse_datetime
+
+COUNT_STAGE = " | count"
+# Stand-in seqnos for planning the second query before the first has run
+PLACEHOLDER_SEQNO = 10_000_000
+
+
+@dataclass
+class StagePlan:
+    name: str
+    items: int
+    # "built" (inputs known), "probed" (and match counts fetched), "estimate" or "checkpoint"
+    basis: str
+    query_bytes: List[int]
+    # Logs each query is expected to match, probed or assumed
+    matched: List[int]
+    window_sec: float
+    requests: int = 0
+    scanned_sec: float = 0.0
+
+    def __post_init__(self):
+        for matched in self.matched:
+            requests, scanned = split_requests(matched, self.window_sec)
+            self.requests += requests
+            self.scanned_sec += scanned
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "basis": self.basis,
+            "queries": len(self.query_bytes),
+            "requests": self.requests,
+            "max_query_bytes": max(self.query_bytes, default=0),
+            "total_query_bytes": sum(self.query_bytes),
+            "matched_logs": sum(self.matched),
+            "window_hours": self.window_sec / 3600,
+            "scanned_window_hours": self.scanned_sec / 3600,
+        }
+
+
+def split_requests(matched: int, window_sec: float) -> Tuple[int, float]:
+    """(requests, window-seconds scanned) for a query matching `matched` logs spread evenly over the window.
+
+    Follows query_logs: a request that comes back with QUERY_LIMIT rows is
+    followed by one request for each half of its window, down to MIN_SPLIT_WINDOW.
+    """
+    if matched < QUERY_LIMIT or window_sec <= MIN_SPLIT_WINDOW.total_seconds():
+        return 1, window_sec
+    requests, scanned = split_requests(matched - matched // 2, window_sec / 2)
+    return 1 + 2 * requests, window_sec + 2 * scanned
+
+
+def probe_count(query: str, start_date: str, end_date: str, client: DataPrimeClient) -> int:
+    """Logs `query` matches in the window, from one `| count` request."""
+    rows = extract_logs_from_response(request_dataprime(query + COUNT_STAGE, start_date, end_date, client))
+    if not rows:
+        return 0
+    data = rows[0].get("userData", rows[0])
+    try:
+        if isinstance(data, str):
+            data = json.loads(data)
+        return int(data["_count"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"count probe returned no _count: {rows[0]!r}") from None
+
+
+class QueryPlan:
+    """The stages of a planned run or recheck, and the probe's round trips if one was made."""
+
+    def __init__(self, start_date: str, end_date: str, batch_size: int, concurrency: int,
+                 client: Optional[DataPrimeClient] = None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.window_sec = (parse_datetime(end_date) - parse_datetime(start_date)).total_seconds()
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        # Only set when probing
+        self.client = client
+        self.stages: List[StagePlan] = []
+        self.probe_latencies: List[float] = []
+
+    def add(self, name: str, build_query: Callable[[List[Any]], str], items: List[Any],
+            logs_per_item: int = 1, estimate: bool = False) -> None:
+        queries = [build_query(items[i:i + self.batch_size]) for i in range(0, len(items), self.batch_size)]
+        if self.client is not None and not estimate:
+            basis = "probed"
+            matched = self._probe(queries)
+        else:
+            basis = "estimate" if estimate else "built"
+            matched = [min(len(items) - i, self.batch_size) * logs_per_item
+                       for i in range(0, len(items), self.batch_size)]
+        self.stages.append(StagePlan(name, len(items), basis, [len(q.encode("utf-8")) for q in queries],
+                                     matched, self.window_sec))
+
+    def add_checkpointed(self, name: str, items: int) -> None:
+        self.stages.append(StagePlan(name, items, "checkpoint", [], [], self.window_sec))
+
+    def _probe(self, queries: List[str]) -> List[int]:
+        def probe(query: str) -> int:
+            sent = time.perf_counter()
+            count = probe_count(query, self.start_date, self.end_date, self.client)
+            self.probe_latencies.append(time.perf_counter() - sent)
+            return count
+
+        if len(queries) == 1 or self.concurrency <= 1:
+            return [probe(q) for q in queries]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(probe, queries))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "window": [self.start_date, self.end_date],
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "stages": {st.name: st.to_dict() for st in self.stages},
+            "requests": sum(st.requests for st in self.stages),
+            "scanned_window_hours": sum(st.scanned_sec for st in self.stages) / 3600,
+        }
+        if self.probe_latencies:
+            mean = sum(self.probe_latencies) / len(self.probe_latencies)
+            data["probe"] = {"requests": len(self.probe_latencies), "mean_latency_sec": mean}
+            # Stages run one after another, each in rounds of `concurrency` requests
+            data["estimated_wall_sec"] = mean * sum(math.ceil(st.requests / self.concurrency)
+                                                    for st in self.stages)
+        return data
+
+    def summary(self) -> str:
+        data = self.to_dict()
+        lines = [f"Window {self.start_date} to {self.end_date} ({self.window_sec / 3600:.1f} h), "
+                 f"--batch-size {self.batch_size}, --concurrency {self.concurrency}",
+                 f"{'stage':<10} {'items':>8} {'queries':>7} {'requests':>8} {'max KiB':>8} {'total KiB':>9} "
+                 f"{'matched':>8} {'scan h':>8}  basis"]
+        for name, v in data["stages"].items():
+            lines.append(f"{name:<10} {v['items']:>8} {v['queries']:>7} {v['requests']:>8} "
+                         f"{v['max_query_bytes'] / 1024:>8.1f} {v['total_query_bytes'] / 1024:>9.1f} "
+                         f"{v['matched_logs']:>8} {v['scanned_window_hours']:>8.1f}  {v['basis']}")
+        lines.append(f"total {data['requests']} requests, {data['scanned_window_hours']:.1f} window-hours scanned, "
+                     f"{sum(math.ceil(st.requests / self.concurrency) for st in self.stages)} rounds "
+                     f"at --concurrency {self.concurrency}")
+        if "probe" in data:
+            lines.append(f"probe: {data['probe']['requests']} count requests, "
+                         f"mean {data['probe']['mean_latency_sec'] * 1000:.0f} ms; "
+                         f"estimated wall time {data['estimated_wall_sec']:.1f}s")
+        if any(st.basis == "estimate" for st in self.stages):
+            lines.append("estimate: depends on earlier results; assumes one seqno per txId "
+                         "and --group-size txIds per seqno")
+        return "\n".join(lines)
+
+
+def plan_run(params: Dict[str, Any], config: Optional[Config] = None, client: Optional[DataPrimeClient] = None,
+             group_size: int = 1, resume: bool = True) -> QueryPlan:
+    """Plan run(params): the four query stages, using a checkpoint of the same inputs where there is one.
+
+    With a client, queries whose inputs are known are probed for their match counts.
+    """
+    config = config or Config()
+    tx_ids: List[str] = params["tx_ids"]
+    tenant_id: str = params["tenant_id"]
+    start_date: str = params["after_date"]
+    end_date: str = params["before_date"]
+    plan = QueryPlan(start_date, end_date, config.batch_size, config.concurrency, client)
+    group_size = max(1, group_size)
+    checkpoint = Checkpoint.for_run(tx_ids, tenant_id, start_date, end_date, fresh=not resume,
+                                    directory=config.checkpoint_dir)
+
+    saved_seqnos = checkpoint.get("seqnos")
+    if saved_seqnos is not None:
+        plan.add_checkpointed("seqnos", len(saved_seqnos))
+        seqnos, known = saved_seqnos, True
+    else:
+        plan.add("seqnos", build_first_query, tx_ids)
+        seqnos = list(range(PLACEHOLDER_SEQNO, PLACEHOLDER_SEQNO + len(tx_ids)))
+        known = False
+
+    saved_pairs = checkpoint.get("pairs")
+    if saved_pairs is not None:
+        plan.add_checkpointed("pairs", len(saved_pairs))
+        pair_txids, known = [tx for _, tx in saved_pairs], True
+    else:
+        plan.add("pairs", lambda batch: build_second_query(tenant_id, batch), seqnos,
+                 logs_per_item=group_size, estimate=not known)
+        # The inputs' siblings are txIds of the same shape
+        pair_txids = list(itertools.islice(itertools.cycle(tx_ids), len(seqnos) * group_size))
+        known = False
+
+    for name, build_query in (("completed", build_third_query), ("sourceids", build_fourth_query)):
+        saved = checkpoint.get(name)
+        if saved is not None:
+            plan.add_checkpointed(name, len(saved))
+        else:
+            plan.add(name, build_query, pair_txids, estimate=not known)
+    return plan
+
+
+def plan_recheck(csv_path: str, config: Optional[Config] = None, since: Optional[str] = None,
+                 client: Optional[DataPrimeClient] = None) -> QueryPlan:
+    """Plan recheck(csv_path): both stages' inputs come from the CSV, so nothing is estimated."""
+    config = config or Config()
+    records = read_csv(csv_path)
+    pending = [rec for rec in records if rec.status == "Unknown"]
+    start_date, end_date = recheck_window(csv_path, since)
+    plan = QueryPlan(start_date, end_date, config.batch_size, config.concurrency, client)
+    plan.add("completed", build_third_query, [decode_txid(rec.txid) for rec in pending])
+    missing_source = [decode_txid(rec.txid) for rec in pending if rec.source_id == UNKNOWN_SOURCE]
+    if missing_source:
+        plan.add("sourceids", build_fourth_query, missing_source)
+    return plan
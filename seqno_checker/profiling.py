@@ -0,0 +1,124 @@
+"""
+--profile / --trace-memory: per-stage cProfile and tracemalloc captures.
+
+A StageProfiler is hooked to a RunMetrics, so a capture runs from the start
+of one stage to the start of the next. It covers the calling thread only.
+Batched queries run on worker threads unless --concurrency is 1, so profile
+with --concurrency 1 to see request and decode time under each stage.
+
+Files written to the profile directory, per stage:
+
+    <stage>.prof         cProfile stats (python -m pstats, snakeviz, ...)
+    <stage>.memory.txt   top allocations made during the stage, by line (--trace-memory)
+
+plus report.txt, which is also printed: the hottest functions over all
+stages, and each stage's time and peak traced memory.
+"""
+import os
+import pstats
+import time
+from typing import List, Optional, Tuple
+
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 10
+
+
+def _snapshot():
+    import tracemalloc
+
+    # tracemalloc's (and cProfile's) own bookkeeping would otherwise top the list
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "*/cProfile.py"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+
+class StageProfiler:
+    def __init__(self, directory: str, cpu: bool = True, memory: bool = False):
+        self.directory = directory
+        self.cpu = cpu
+        self.memory = memory
+        self._stage: Optional[str] = None
+        self._profile = None
+        self._snapshot = None
+        self._started = 0.0
+        # (stage, seconds, peak traced bytes or None)
+        self._stages: List[Tuple[str, float, Optional[int]]] = []
+        os.makedirs(directory, exist_ok=True)
+        if memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def start_stage(self, name: str) -> None:
+        self._stop()
+        self._stage = name
+        if self.memory:
+            self._snapshot = _snapshot()
+        if self.cpu:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+        # Last, so the snapshot above isn't counted in the stage's time or peak
+        self._started = time.perf_counter()
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.reset_peak()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def _stop(self) -> None:
+        if self._stage is None:
+            return
+        elapsed = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self._path(f"{self._stage}.prof"))
+            self._profile = None
+        peak = None
+        if self.memory:
+            import tracemalloc
+
+            peak = tracemalloc.get_traced_memory()[1]
+            diff = _snapshot().compare_to(self._snapshot, "lineno")
+            self._snapshot = None
+            with open(self._path(f"{self._stage}.memory.txt"), "w", encoding="utf-8") as f:
+                f.write(f"Peak traced memory during {self._stage}: {peak / 1024:.0f} KiB\n")
+                f.write(f"Top {TOP_ALLOCATIONS} allocations by growth:\n")
+                for stat in diff[:TOP_ALLOCATIONS]:
+                    f.write(f"  {stat}\n")
+        self._stages.append((self._stage, elapsed, peak))
+        self._stage = None
+
+    def finish(self) -> str:
+        """Stop the current capture, write report.txt and return its text."""
+        self._stop()
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.stop()
+        lines = []
+        prof_files = [self._path(f"{stage}.prof") for stage, _, _ in self._stages]
+        if self.cpu and prof_files:
+            stats = pstats.Stats(*prof_files)
+            hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCTIONS]
+            lines.append("Hottest functions (all stages, by own time):")
+            lines.append(f"{'own ms':>9} {'cum ms':>9} {'calls':>9}  function")
+            for (filename, lineno, func), (_, calls, own, cum, _) in hottest:
+                where = f"{os.path.basename(filename)}:{lineno}" if lineno else filename
+                lines.append(f"{own * 1000:>9.1f} {cum * 1000:>9.1f} {calls:>9}  {func} ({where})")
+        lines.append("Stages:" if not self.memory else "Stages (with peak traced memory):")
+        for stage, seconds, peak in self._stages:
+            memory = f" {peak / 1024:>10.0f} KiB" if peak is not None else ""
+            lines.append(f"  {stage:<10} {seconds * 1000:>10.1f} ms{memory}")
+        lines.append(f"Captures written to {self.directory}/")
+        report = "\n".join(lines)
+        with open(self._path("report.txt"), "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        return report
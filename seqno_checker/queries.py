@@ -0,0 +1,65 @@
+"""DataPrime query builders, one per pipeline stage."""
+from typing import List
+
+
+def escape_single_quotes(s: str) -> str:
+    return s.replace("'", "\\'")
+
+
+def build_first_query(tx_ids: List[str]) -> str:
+    terms = []
+    for tx in tx_ids:
+        tx = tx.strip()
+        if not tx:
+            continue
+        esc = escape_single_quotes(tx)
+        terms.append(f"$d ~~ '{esc}' && $d ~~ 'seqno' && $d ~~ 'enrichment object'")
+    if not terms:
+        raise ValueError("No valid transaction IDs provided.")
+    return "source logs | filter " + " || ".join(terms)
+
+
+def build_second_query(tenant_id: str, seqnos: List[int]) -> str:
+    tenant_id = escape_single_quotes(tenant_id.strip())
+    parts = []
+    for seq in seqnos:
+        parts.append(f"($d ~~ '{tenant_id}' && $d ~~ 'seqno:{seq}'  && $d ~~ 'enrichment object')")
+    if not parts:
+        raise ValueError("No seqno values to build the second query.")
+    return "source logs | filter " + " || ".join(parts)
+
+
+def build_third_query(tx_ids: List[str]) -> str:
+    """Build query to check completion status for transaction IDs."""
+    parts = []
+    for tx_id in tx_ids:
+        tx_id = escape_single_quotes(tx_id.strip())
+        if not tx_id:
+            continue
+        # Use the correct pattern: txId && status update to COMPLETED
+        parts.append(f"($d ~~ '{tx_id}' && $d ~~ 'status update to COMPLETED')")
+    if not parts:
+        raise ValueError("No transaction IDs to build the third query.")
+    return "source logs | filter " + " || ".join(parts)
+
+
+def build_fourth_query(tx_ids: List[str]) -> str:
+    """Build query to extract sourceId for transaction IDs."""
+    parts = []
+    for tx_id in tx_ids:
+        tx_id = escape_single_quotes(tx_id.strip())
+        if not tx_id:
+            continue
+        # Query pattern: txId && sourceId (simpler pattern that works)
+        parts.append(f"($d ~~ '{tx_id}' && $d ~~ 'sourceId')")
+    if not parts:
+        raise ValueError("No transaction IDs to build the fourth query.")
+    return "source logs | filter " + " || ".join(parts)
+
+
+def build_tenant_seqno_query(tenant_id: str) -> str:
+    """Build query for all seqno enrichment logs of a tenant (used by watch mode)."""
+    tenant_id = escape_single_quotes(tenant_id.strip())
+    if not tenant_id:
+        raise ValueError("No tenant id to build the tenant seqno query.")
+    return f"source logs | filter $d ~~ '{tenant_id}' && $d ~~ 'seqno' && $d ~~ 'enrichment object'"
@@ -0,0 +1,42 @@
+"""Result records and their CSV row form."""
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from .ids import SourceKey, TxKey, UNKNOWN_SOURCE, decode_source_id, decode_txid, encode_source_id, encode_txid
+
+# CSV column names; dict-shaped rows only exist at the CSV boundary
+SEQNO_FIELD = "Seqno"
+TXID_FIELD = "metadata.requestContext.txId"
+SOURCEID_FIELD = "sourceId"
+STATUS_FIELD = "Status"
+CSV_FIELDNAMES = [SEQNO_FIELD, TXID_FIELD, SOURCEID_FIELD, STATUS_FIELD]
+
+
+@dataclass(slots=True)
+class TxRecord:
+    """One seqno/txId pair together with its sourceId and status.
+
+    txid and source_id hold encoded keys (see encode_txid/encode_source_id).
+    """
+    seqno: int
+    txid: TxKey
+    source_id: SourceKey = UNKNOWN_SOURCE
+    status: str = "Unknown"
+
+
+def record_to_row(rec: TxRecord) -> Dict[str, Any]:
+    return {
+        SEQNO_FIELD: rec.seqno,
+        TXID_FIELD: decode_txid(rec.txid),
+        SOURCEID_FIELD: decode_source_id(rec.source_id),
+        STATUS_FIELD: rec.status,
+    }
+
+
+def record_from_row(row: Dict[str, Any]) -> TxRecord:
+    return TxRecord(
+        int(row[SEQNO_FIELD]),
+        encode_txid(row[TXID_FIELD]),
+        encode_source_id(row.get(SOURCEID_FIELD) or UNKNOWN_SOURCE),
+        row.get(STATUS_FIELD) or "Unknown",
+    )
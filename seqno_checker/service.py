@@ -0,0 +1,177 @@
+"""HTTP lookup service (--serve)."""
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from . import log, openmetrics
+from .client import DataPrimeClient
+from .config import Config
+from .inputs import make_params
+from .pipeline import investigate
+from .records import record_to_row
+from .timeutil import format_utc
+
+# Default lookup window when none is given
+LOOKUP_WINDOW = timedelta(hours=24)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, Future] = {}
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> tuple:
+        """Returns (result, shared); shared is True when another caller's run was reused."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result(), False
+
+
+class LookupService:
+    """Answers single-txId lookups over a warm client, with caching and coalescing.
+
+    Batching, concurrency, the status engine threshold and the cache TTL come from `config`.
+    """
+
+    def __init__(self, client: DataPrimeClient, config: Optional[Config] = None):
+        self.client = client
+        self.config = config or Config()
+        self.cache = TTLCache(self.config.cache_ttl)
+        self.flights = SingleFlight()
+
+    def lookup(self, tx_id: str, tenant_id: str, after: Optional[str] = None,
+               before: Optional[str] = None) -> Dict[str, Any]:
+        """Raises ValueError for a bad or half-specified window."""
+        if bool(after) != bool(before):
+            raise ValueError("after and before must be given together")
+        key = (tx_id, tenant_id, after, before)
+        cached = self.cache.get(key)
+        if openmetrics.ENABLED:
+            openmetrics.CACHE_REQUESTS.inc(1, "miss" if cached is None else "hit")
+        if cached is not None:
+            return {**cached, "cached": True, "coalesced": False}
+
+        def _query() -> Tuple[Dict[str, Any], bool]:
+            # A flight for the same key may have finished between the miss above and now
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, True
+            if after and before:
+                params = make_params([tx_id], tenant_id, after, before)
+                start_date, end_date = params["after_date"], params["before_date"]
+            else:
+                now = datetime.now(timezone.utc)
+                start_date, end_date = format_utc(now - LOOKUP_WINDOW), format_utc(now)
+            tenant_client = self.client.for_tenant(tenant_id)
+            records = investigate([tx_id], tenant_id, start_date, end_date, tenant_client, self.config.batch_size,
+                                  self.config.concurrency, self.config.vectorize_min_rows)
+            result = {
+                "txId": tx_id,
+                "tenant": tenant_id,
+                "startDate": start_date,
+                "endDate": end_date,
+                "rows": [record_to_row(rec) for rec in records],
+            }
+            self.cache.put(key, result)
+            return result, False
+
+        (result, cached), shared = self.flights.do(key, _query)
+        return {**result, "cached": cached, "coalesced": shared}
+
+
+class _LookupHandler(BaseHTTPRequestHandler):
+    service: LookupService
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/lookup":
+            self._send_json(404, {"error": "not found"})
+            return
+        query = parse_qs(url.query)
+        tx_id = (query.get("txId") or [""])[0].strip()
+        tenant_id = (query.get("tenant") or [""])[0].strip()
+        if not tx_id or not tenant_id:
+            self._send_json(400, {"error": "txId and tenant are required"})
+            return
+        after = (query.get("after") or [None])[0]
+        before = (query.get("before") or [None])[0]
+        try:
+            self._send_json(200, self.service.lookup(tx_id, tenant_id, after, before))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(502, {"error": f"DataPrime query failed: {e}"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.info("%s - " + format, self.address_string(), *args)
+
+
+def serve(client: DataPrimeClient, host: str, port: int, config: Optional[Config] = None) -> None:
+    """Serve GET /lookup?txId=...&tenant=...[&after=...&before=...] as JSON."""
+    service = LookupService(client, config)
+    handler = type("LookupHandler", (_LookupHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    log.info("Serving lookups on http://%s:%s/lookup", host, server.server_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("\nShutting down.")
+    finally:
+        server.server_close()
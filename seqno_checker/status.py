@@ -0,0 +1,116 @@
+"""The status engine: Completed / Safe to fail / Unknown per (seqno, sourceId) group."""
+from typing import Dict, List
+
+from . import log
+from .config import DEFAULT_VECTORIZE_MIN_ROWS
+from .ids import SourceKey, TxKey, UNKNOWN_SOURCE, encode_source_id, encode_txid
+from .openmetrics import observe_status
+from .output import _write_csv_records, read_csv
+from .records import TxRecord
+
+_np = None
+
+
+def _load_numpy():
+    """NumPy, or None when it isn't installed. Only imported for large inputs."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            _np = False
+        else:
+            _np = numpy
+    return _np or None
+
+
+@observe_status
+def apply_status(records: List[TxRecord], completed_txids: List[TxKey], sourceid_mapping: Dict[TxKey, SourceKey],
+                 vectorize_min_rows: int = DEFAULT_VECTORIZE_MIN_ROWS) -> None:
+    """Fill in sourceId and status on each record in place (all IDs encoded).
+
+    From `vectorize_min_rows` records on, the NumPy path is used when NumPy is installed.
+    """
+    for rec in records:
+        rec.source_id = sourceid_mapping.get(rec.txid, UNKNOWN_SOURCE)
+
+    completed_set = set(completed_txids)
+    if len(records) >= vectorize_min_rows and _load_numpy() is not None:
+        _apply_status_numpy(records, completed_set)
+    else:
+        _apply_status_python(records, completed_set)
+
+
+def _apply_status_python(records: List[TxRecord], completed_set: set) -> None:
+    # Pass 1: flag every (seqno, sourceId) group that has a completed member
+    completed_groups = set()
+    for rec in records:
+        if rec.txid in completed_set:
+            completed_groups.add((rec.seqno, rec.source_id))
+
+    # Pass 2: a record that isn't completed itself is safe to fail when its
+    # group has a completed member (necessarily a different txId)
+    for rec in records:
+        if rec.txid in completed_set:
+            rec.status = "Completed"
+        elif (rec.seqno, rec.source_id) in completed_groups:
+            rec.status = "Safe to fail"
+        else:
+            rec.status = "Unknown"
+
+
+_STATUS_BY_CODE = ("Completed", "Safe to fail", "Unknown")
+
+
+def _apply_status_numpy(records: List[TxRecord], completed_set: set) -> None:
+    """Same rules as _apply_status_python, with the grouping done in NumPy."""
+    np = _load_numpy()
+    n = len(records)
+    if not n:
+        return
+    # sourceIds are a mix of ints and strings, so dictionary-encode them first
+    source_codes: Dict[SourceKey, int] = {}
+    src = np.fromiter(
+        (source_codes.setdefault(rec.source_id, len(source_codes)) for rec in records),
+        dtype=np.int64, count=n,
+    )
+    seq = np.fromiter((rec.seqno for rec in records), dtype=np.int64, count=n)
+    completed = np.fromiter((rec.txid in completed_set for rec in records), dtype=bool, count=n)
+
+    _, seq_codes = np.unique(seq, return_inverse=True)
+    _, group = np.unique(seq_codes * len(source_codes) + src, return_inverse=True)
+    group_has_completed = np.bincount(group, weights=completed) > 0
+
+    codes = np.where(completed, 0, np.where(group_has_completed[group], 1, 2))
+    for rec, code in zip(records, codes.tolist()):
+        rec.status = _STATUS_BY_CODE[code]
+
+
+def print_status_summary(records: List[TxRecord]) -> None:
+    counts = {"Completed": 0, "Safe to fail": 0, "Unknown": 0}
+    for rec in records:
+        counts[rec.status] = counts.get(rec.status, 0) + 1
+    log.info("Status information:")
+    log.info("  - Completed: %s", counts['Completed'])
+    log.info("  - Safe to fail: %s", counts['Safe to fail'])
+    log.info("  - Unknown: %s", counts['Unknown'])
+
+
+def update_csv_with_status(csv_path: str, completed_txids: List[TxKey], sourceid_mapping: Dict[TxKey, SourceKey]) -> None:
+    """Update CSV file with completion status and mark other txIds as 'Safe to fail'.
+
+    Accepts raw or encoded IDs; they are normalized before grouping.
+    """
+    if not completed_txids:
+        log.info("No completed transaction IDs found. CSV will remain unchanged.")
+        return
+
+    records = read_csv(csv_path)
+    completed = [encode_txid(t) for t in completed_txids]
+    mapping = {encode_txid(t): encode_source_id(s) for t, s in sourceid_mapping.items()}
+    apply_status(records, completed, mapping)
+
+    # Write updated CSV
+    _write_csv_records(csv_path, records)
+
+    print_status_summary(records)
@@ -0,0 +1,66 @@
+"""Timestamp parsing and formatting; all windows are UTC strings like 2025-01-20T00:00:00Z."""
+from datetime import datetime, timedelta, timezone
+
+
+def format_utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Parse timestamp input in any of the supported formats.
+
+    Returns:
+        Timezone-aware datetime. ISO-8601 values without an offset are taken
+        as UTC; the human-readable formats are taken as local time.
+    """
+    s = value.strip()
+    
+    # ISO-8601, including the UTC format 2025-01-20T00:00:00Z
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    
+    # Try a common format "YYYY-MM-DD HH:MM:SS" and assume UTC
+    try:
+        return datetime.strptime(s, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    
+    # Handle 12-hour format: "Sep 7, 2025, 4:15:50 PM" in the user's local timezone
+    try:
+        return datetime.strptime(s, "%b %d, %Y, %I:%M:%S %p").astimezone()
+    except ValueError:
+        pass
+    
+    # Handle 24-hour format: "7 Sept 2025, 16:15:59" in the user's local timezone
+    try:
+        # Normalize month abbreviation (Sept -> Sep)
+        return datetime.strptime(s.replace("Sept", "Sep"), "%d %b %Y, %H:%M:%S").astimezone()
+    except ValueError:
+        pass
+    
+    # If all parsing attempts fail, provide helpful error message
+    raise ValueError(f"Unrecognized time format: {value}. Expected formats: 'Sep 7, 2025, 4:15:50 PM', '7 Sept 2025, 16:15:59', or '2025-01-20T00:00:00Z'")
+
+
+def parse_utc_timestamp(value: str, is_after: bool = True) -> str:
+    """
+    Parse timestamp input and convert to UTC format.
+    
+    Args:
+        value: Timestamp string in various formats
+        is_after: True for 'after' timestamp (subtract 6 hours), False for 'before' (add 6 hours)
+    
+    Returns:
+        UTC timestamp string in format "2025-01-20T00:00:00Z"
+    """
+    dt = parse_datetime(value)
+    # Apply time adjustment
+    if is_after:
+        dt = dt - timedelta(hours=6)
+    else:
+        dt = dt + timedelta(hours=6)
+    return format_utc(dt)
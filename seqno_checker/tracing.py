@@ -0,0 +1,223 @@
+"""
+Span tracing to a local file (--trace).
+
+Spans cover the run, each stage, each query_logs window (window bisection
+shows up as nested windows), each DataPrime request and each extractor pass.
+Each finished span is appended to the trace file as one line of OTLP/JSON
+(an ExportTraceServiceRequest holding that span). The OpenTelemetry
+Collector's otlpjsonfile receiver, and anything else that reads OTLP/JSON,
+can load the file.
+
+Until start_tracing() is called, span() returns a shared no-op span, so the
+instrumented code costs one check per span.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+SERVICE_NAME = "seqno-checker"
+
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("seqno_span", default=None)
+_tracer: Optional["Tracer"] = None
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class Tracer:
+    """Appends finished spans to `path`, one OTLP/JSON line each."""
+
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        self.path = path
+        self.resource = {"attributes": [_attribute("service.name", service_name)]}
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: "Span") -> None:
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [_attribute(k, v) for k, v in span.attributes.items()],
+        }
+        if span.parent_id:
+            record["parentSpanId"] = span.parent_id
+        if span.error:
+            record["status"] = {"code": STATUS_ERROR, "message": span.error}
+        line = json.dumps({"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{"scope": {"name": "seqno_checker"}, "spans": [record]}],
+        }]}, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Span:
+    """A started span. As a context manager it is also the current span, which
+    new spans in the same thread (or in functions wrapped with bind()) take as
+    their parent."""
+
+    recording = True
+
+    def __init__(self, tracer: Tracer, name: str, kind: int, parent: Optional["Span"],
+                 attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        if not self.end_ns:
+            self.end_ns = time.time_ns()
+            self.tracer.export(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        _current.reset(self._token)
+        if isinstance(exc, Exception):
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.end()
+
+
+class _NoopSpan:
+    recording = False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def start_tracing(path: str) -> Tracer:
+    global _tracer
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def stop_tracing() -> None:
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
+
+
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Any:
+    """Start a span under the current one (a new trace if there is none)."""
+    if _tracer is None:
+        return NOOP_SPAN
+    return Span(_tracer, name, kind, _current.get(), attributes)
+
+
+def current_span() -> Any:
+    return _current.get() or NOOP_SPAN
+
+
+def bind(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap fn to run under the caller's current span, e.g. in a thread pool worker."""
+    parent = _current.get()
+    if parent is None:
+        return fn
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def traced_extractor(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """A span per extractor pass, with the logs in and rows out; generators are traced until exhausted."""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(logs: List[Dict[str, Any]], *args: Any, **kwargs: Any) -> Any:
+            if _tracer is None:
+                return fn(logs, *args, **kwargs)
+            sp = span(f"extract {name}", **{"extract.logs": len(logs)})
+            result = fn(logs, *args, **kwargs)
+            if isinstance(result, types.GeneratorType):
+                return _traced(result, sp)
+            sp.set("extract.rows", len(result))
+            sp.end()
+            return result
+        return wrapper
+    return decorate
+
+
+def _traced(items: Any, sp: Span) -> Any:
+    rows = 0
+    for item in items:
+        rows += 1
+        yield item
+    sp.set("extract.rows", rows)
+    sp.end()
+
+
+class StageSpans:
+    """RunMetrics.on_stage callback: one span per stage, each current until the next starts."""
+
+    def __init__(self):
+        self._span: Optional[Span] = None
+        self._token = None
+
+    def start_stage(self, name: str) -> None:
+        self.finish()
+        sp = span(f"stage {name}", **{"stage": name})
+        if isinstance(sp, Span):
+            self._span, self._token = sp, _current.set(sp)
+
+    def finish(self) -> None:
+        if self._span is not None:
+            _current.reset(self._token)
+            self._span.end()
+            self._span = None
@@ -0,0 +1,180 @@
+"""Watch mode: poll a tenant incrementally from a persisted watermark."""
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from . import log, openmetrics
+from .client import DataPrimeClient
+from .config import DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY
+from .extract import extract_completed_txids, extract_source_ids, iter_pairs_seqno_txid
+from .ids import TxKey, UNKNOWN_SOURCE, decode_source_id, decode_txid, encode_source_id, encode_txid
+from .output import JsonlEmitter, append_csv, atomic_write
+from .pipeline import fetch_logs, query_logs
+from .queries import build_fourth_query, build_tenant_seqno_query, build_third_query
+from .records import TxRecord
+from .timeutil import format_utc, parse_datetime
+
+# Poll windows overlap by WATCH_OVERLAP to allow for ingestion lag, and
+# verdicts/unresolved txIds older than WATCH_RETENTION are dropped
+WATCH_OVERLAP = timedelta(minutes=2)
+WATCH_RETENTION = timedelta(hours=24)
+
+
+class WatchState:
+    """What watch mode keeps between polls.
+
+    Only the watermark (end of the last successful poll), the txIds that are
+    still unresolved and recent verdicts are kept: `completed_groups` lets a
+    late sibling of a completed txId be marked Safe to fail, and `resolved`
+    stops txIds seen again in the overlap from being reported twice.
+    """
+
+    def __init__(self, watermark: datetime):
+        self.watermark = watermark
+        self.pending: Dict[TxKey, TxRecord] = {}
+        self.first_seen: Dict[TxKey, float] = {}
+        self.completed_groups: Dict[tuple, float] = {}
+        self.resolved: Dict[TxKey, float] = {}
+
+    @classmethod
+    def load(cls, path: str, watermark: datetime) -> "WatchState":
+        state = cls(watermark)
+        if not os.path.exists(path):
+            return state
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        state.watermark = parse_datetime(data["watermark"])
+        for seq, tx, src, seen in data.get("pending", []):
+            rec = TxRecord(seq, encode_txid(tx), encode_source_id(src))
+            state.pending[rec.txid] = rec
+            state.first_seen[rec.txid] = seen
+        state.completed_groups = {
+            (seq, encode_source_id(src)): ts for seq, src, ts in data.get("completed_groups", [])
+        }
+        state.resolved = {encode_txid(tx): ts for tx, ts in data.get("resolved", {}).items()}
+        return state
+
+    def save(self, path: str) -> None:
+        data = {
+            "watermark": format_utc(self.watermark),
+            "pending": [
+                [rec.seqno, decode_txid(rec.txid), decode_source_id(rec.source_id), self.first_seen[rec.txid]]
+                for rec in self.pending.values()
+            ],
+            "completed_groups": [[seq, decode_source_id(src), ts] for (seq, src), ts in self.completed_groups.items()],
+            "resolved": {decode_txid(tx): ts for tx, ts in self.resolved.items()},
+        }
+        with atomic_write(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    def expire(self, now_ts: float) -> List[TxRecord]:
+        """Forget old verdicts; returns pending records that are too old to keep waiting for."""
+        cutoff = now_ts - WATCH_RETENTION.total_seconds()
+        self.completed_groups = {k: ts for k, ts in self.completed_groups.items() if ts >= cutoff}
+        self.resolved = {k: ts for k, ts in self.resolved.items() if ts >= cutoff}
+        expired = [rec for txid, rec in self.pending.items() if self.first_seen[txid] < cutoff]
+        for rec in expired:
+            del self.pending[rec.txid]
+            del self.first_seen[rec.txid]
+        return expired
+
+
+def poll_once(state: WatchState, tenant_id: str, client: DataPrimeClient, batch_size: int = DEFAULT_BATCH_SIZE,
+              concurrency: int = DEFAULT_CONCURRENCY, emitter: Optional[JsonlEmitter] = None) -> List[TxRecord]:
+    """Query the window since the watermark and return the records resolved in it."""
+    now = datetime.now(timezone.utc)
+    now_ts = now.timestamp()
+    start_date = format_utc(state.watermark - WATCH_OVERLAP)
+    end_date = format_utc(now)
+    log.info("\nPolling %s to %s...", start_date, end_date)
+
+    logs = query_logs(build_tenant_seqno_query(tenant_id), start_date, end_date, client)
+    new = 0
+    for pair in iter_pairs_seqno_txid(logs):
+        if pair.txid in state.pending or pair.txid in state.resolved:
+            continue
+        state.pending[pair.txid] = pair
+        state.first_seen[pair.txid] = now_ts
+        new += 1
+        if emitter:
+            emitter.emit("pair", pair)
+    log.info("Found %s new seqno/txId pairs; %d unresolved.", new, len(state.pending))
+
+    if state.pending:
+        pending_txids = [decode_txid(txid) for txid in state.pending]
+        completed = set(extract_completed_txids(
+            fetch_logs(build_third_query, pending_txids, start_date, end_date, client, batch_size, concurrency)
+        ))
+        missing_source = [decode_txid(rec.txid) for rec in state.pending.values() if rec.source_id == UNKNOWN_SOURCE]
+        if missing_source:
+            mapping = extract_source_ids(
+                fetch_logs(build_fourth_query, missing_source, start_date, end_date, client, batch_size, concurrency)
+            )
+            for txid, source_id in mapping.items():
+                if txid in state.pending:
+                    state.pending[txid].source_id = source_id
+        for rec in state.pending.values():
+            if rec.txid in completed:
+                rec.status = "Completed"
+                state.completed_groups[(rec.seqno, rec.source_id)] = now_ts
+        for rec in state.pending.values():
+            if rec.status != "Completed" and (rec.seqno, rec.source_id) in state.completed_groups:
+                rec.status = "Safe to fail"
+
+    resolved = [rec for rec in state.pending.values() if rec.status != "Unknown"]
+    for rec in resolved:
+        del state.pending[rec.txid]
+        del state.first_seen[rec.txid]
+        state.resolved[rec.txid] = now_ts
+    expired = state.expire(now_ts)
+    if expired:
+        log.info("Giving up on %d txIds unresolved for over %s.", len(expired), WATCH_RETENTION)
+    state.watermark = now
+    return resolved + expired
+
+
+def watch(tenant_id: str, client: DataPrimeClient, state_path: str, output_path: str, interval: float,
+          after: Optional[str] = None, once: bool = False, emitter: Optional[JsonlEmitter] = None,
+          batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+          metrics_textfile: Optional[str] = None) -> None:
+    """Poll a tenant's new seqno logs every `interval` seconds and reconcile them incrementally.
+
+    Resolved records (and ones that stay Unknown for WATCH_RETENTION) are appended
+    to `output_path`; the state file lets a restarted watcher carry on where it stopped.
+    With `metrics_textfile`, the OpenMetrics registry is written there after every poll.
+    """
+    start = parse_datetime(after) if after else datetime.now(timezone.utc) - timedelta(seconds=interval)
+    state = WatchState.load(state_path, start)
+    if openmetrics.ENABLED:
+        openmetrics.UNRESOLVED_TXIDS.set(len(state.pending))
+    log.info("Watching tenant %s from %s, every %gs.", tenant_id, format_utc(state.watermark), interval)
+    try:
+        while True:
+            try:
+                resolved = poll_once(state, tenant_id, client, batch_size, concurrency, emitter)
+            except Exception as e:
+                # Leave the watermark alone so the next poll covers this window again
+                log.warning("Poll failed: %s", e)
+                if openmetrics.ENABLED:
+                    openmetrics.WATCH_POLLS.inc(1, "error")
+            else:
+                if openmetrics.ENABLED:
+                    openmetrics.WATCH_POLLS.inc(1, "ok")
+                    openmetrics.UNRESOLVED_TXIDS.set(len(state.pending))
+                if resolved:
+                    append_csv(resolved, output_path)
+                    log.info("Appended %d resolved rows to %s", len(resolved), output_path)
+                    if emitter:
+                        for rec in resolved:
+                            emitter.emit("status", rec)
+                state.save(state_path)
+            if metrics_textfile:
+                openmetrics.write_textfile(metrics_textfile)
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        log.info("\nStopping watch.")
+        state.save(state_path)
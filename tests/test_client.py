@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from seqno_checker import client as client_module
+from seqno_checker.client import MAX_THROTTLE_RETRIES, DataPrimeClient, FairLimiter
+from seqno_checker.mock_server import MockDataPrime, query_url, start_mock_server
+
+
+def _queued(limiter, key, n):
+    with limiter._cond:
+        return len(limiter._queues.get(key, ())) == n
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_fair_limiter_interleaves_keys():
+    limiter = FairLimiter(1)
+    order = []
+
+    def worker(key):
+        with limiter.slot(key):
+            order.append(key)
+
+    threads = []
+    with limiter.slot("holder"):
+        # "flood" queues six requests before "other" queues three
+        for key, n in [("flood", 6), ("other", 3)]:
+            for i in range(n):
+                threads.append(threading.Thread(target=worker, args=(key,)))
+                threads[-1].start()
+                _wait_for(lambda: _queued(limiter, key, i + 1))
+    for t in threads:
+        t.join(5)
+    assert order == ["flood", "other"] * 3 + ["flood"] * 3
+
+
+def test_fair_limiter_caps_in_flight():
+    limiter = FairLimiter(2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def worker(key):
+        with limiter.slot(key):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.005)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=worker, args=(f"tenant-{i % 3}",)) for i in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert peak[0] == 2
+
+
+class _Response:
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.content = text.encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.posts = 0
+
+    def post(self, *args, **kwargs):
+        self.posts += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(client_module.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_throttled_query_is_retried_after_retry_after(sleeps):
+    ok = _Response(200, text='{"result":{"results":[]}}')
+    session = _Session([_Response(429, {"Retry-After": "7"}), _Response(429), _Response(429, {"Retry-After": "1e6"}),
+                        ok])
+    client = DataPrimeClient("secret", "http://dataprime.invalid/query", session=session)
+    assert client.query("source logs", "2025-01-20T00:00:00Z", "2025-01-20T01:00:00Z") == {"result": {"results": []}}
+    assert session.posts == 4
+    # Retry-After, then backoff without one, then capped
+    assert sleeps == [7.0, 2.0, client_module.MAX_RETRY_WAIT]
+
+
+def test_throttled_query_gives_up_after_max_retries(sleeps):
+    mock = MockDataPrime([], throttle_rate=1.0, seed=1)
+    server = start_mock_server(mock)
+    try:
+        client = DataPrimeClient("secret", query_url(server))
+        with pytest.raises(requests.HTTPError):
+            client.query("source logs | filter $d ~~ 'x'", "2025-01-20T00:00:00Z", "2025-01-20T01:00:00Z")
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert mock.stats["status_429"] == MAX_THROTTLE_RETRIES + 1
+    assert sleeps == [1.0] * MAX_THROTTLE_RETRIES
@@ -0,0 +1,67 @@
+import pytest
+
+from seqno_checker.ids import decode_source_id, decode_txid, encode_source_id, encode_txid
+
+TXIDS = [
+    "1e95933d-87ce-43f0-ac7b-5159cc887cbc",
+    "00000000-0000-0000-0000-000000000000",
+    "ffffffff-ffff-ffff-ffff-ffffffffffff",
+    # Not canonical, so kept as strings
+    "1E95933D-87CE-43F0-AC7B-5159CC887CBC",
+    "1e95933d87ce43f0ac7b5159cc887cbc",
+    "{1e95933d-87ce-43f0-ac7b-5159cc887cbc}",
+    " 1e95933d-87ce-43f0-ac7b-5159cc887cbc",
+    "1e95933d-87ce-43f0-ac7b-5159cc887cbg",
+    "1e95933d_87ce_43f0_ac7b_5159cc887cbc",
+    "not-a-uuid",
+    "",
+]
+
+SOURCE_IDS = ["0", "1", "455647", "18446744073709551616", "00", "007", "-1", "+1", " 1", "1.0", "1e3",
+              "١٢٣", "²", "abc", "Unknown", ""]
+
+
+@pytest.mark.parametrize("value", TXIDS)
+def test_txid_round_trip(value):
+    assert decode_txid(encode_txid(value)) == value
+
+
+@pytest.mark.parametrize("value", SOURCE_IDS)
+def test_source_id_round_trip(value):
+    assert decode_source_id(encode_source_id(value)) == value
+
+
+def test_only_canonical_uuids_become_ints():
+    assert isinstance(encode_txid(TXIDS[0]), int)
+    assert encode_txid(TXIDS[0]) == 0x1e95933d87ce43f0ac7b5159cc887cbc
+    for value in TXIDS[3:]:
+        assert isinstance(encode_txid(value), str)
+
+
+def test_uppercase_uuid_is_distinct_from_lowercase():
+    assert encode_txid(TXIDS[0]) != encode_txid(TXIDS[3])
+
+
+def test_only_plain_decimal_source_ids_become_ints():
+    assert encode_source_id("455647") == 455647
+    assert encode_source_id("0") == 0
+    for value in ("00", "007", "-1", "+1", " 1", "١٢٣", "²", ""):
+        assert isinstance(encode_source_id(value), str)
+
+
+def test_encoding_is_idempotent():
+    for value in TXIDS:
+        assert encode_txid(encode_txid(value)) == encode_txid(value)
+    for value in SOURCE_IDS:
+        assert encode_source_id(encode_source_id(value)) == encode_source_id(value)
+
+
+def test_small_int_txid_decodes_zero_padded():
+    assert decode_txid(1) == "00000000-0000-0000-0000-000000000001"
+    assert encode_txid(decode_txid(1)) == 1
+
+
+def test_strings_are_interned():
+    a = encode_txid("".join(["tx-", "abc"]))
+    b = encode_txid("".join(["tx-", "abc"]))
+    assert a is b
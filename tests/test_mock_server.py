@@ -0,0 +1,204 @@
+import json
+
+import pytest
+
+from seqno_checker.client import DataPrimeClient
+from seqno_checker.corpus import DEFAULT_START, generate_logs
+from seqno_checker.mock_server import (
+    MockDataPrime, QuerySyntaxError, _contains_term, parse_query, query_url, start_mock_server,
+)
+from seqno_checker.queries import build_first_query, build_second_query, build_third_query
+
+WINDOW = ("2000-01-01T00:00:00Z", "2100-01-01T00:00:00Z")
+
+
+def _request(query, limit=None, start=WINDOW[0], end=WINDOW[1]):
+    metadata = {"startDate": start, "endDate": end}
+    if limit is not None:
+        metadata["limit"] = limit
+    return json.dumps({"query": query, "metadata": metadata}).encode("utf-8")
+
+
+def _lines(body):
+    return [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+
+def _log(text, ts="2025-01-20T00:00:00Z"):
+    return {"userData": text, "timestamp": ts}
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    truth = []
+    logs = list(generate_logs(400, seed=7, group_size=4, tenants=2, truth=truth))
+    return logs, truth
+
+
+def test_parse_query_builds_dnf():
+    dnf = parse_query("source logs | filter ($d ~~ 'A' && $d ~~ 'b') || $d ~~ 'C'")
+    assert dnf == [["a", "b"], ["c"]]
+
+
+def test_parse_query_distributes_and_over_or():
+    dnf = parse_query("source logs | filter $d ~~ 'x' && ($d ~~ 'y' || $d ~~ 'z')")
+    assert dnf == [["x", "y"], ["x", "z"]]
+
+
+def test_parse_query_ands_filter_stages():
+    dnf = parse_query("source logs | filter $d ~~ 'a' || $d ~~ 'b' | filter $d ~~ 'c'")
+    assert dnf == [["a", "c"], ["b", "c"]]
+
+
+def test_parse_query_unescapes_and_normalizes_terms():
+    assert parse_query("source logs | filter $d ~~ 'it\\'s \"Q\"'") == [["it's q"]]
+
+
+@pytest.mark.parametrize("query", [
+    "logs | filter $d ~~ 'a'",
+    "source logs | limit 10",
+    "source logs | filter $d ~~ 'a' &&",
+    "source logs | filter ($d ~~ 'a'",
+    "source logs | filter $d ~~ a",
+])
+def test_parse_query_rejects_unsupported_syntax(query):
+    with pytest.raises(QuerySyntaxError):
+        parse_query(query)
+
+
+def test_terms_match_on_word_boundaries():
+    assert _contains_term("seqno:42,", "seqno:42")
+    assert not _contains_term("seqno:420", "seqno:42")
+    assert not _contains_term("xseqno:42", "seqno:42")
+
+
+def test_builder_queries_parse():
+    assert parse_query(build_first_query(["TX-1", "tx-2"])) == [
+        ["tx-1", "seqno", "enrichment object"], ["tx-2", "seqno", "enrichment object"],
+    ]
+    assert parse_query(build_second_query("tenant", [1, 2])) == [
+        ["tenant", "seqno:1", "enrichment object"], ["tenant", "seqno:2", "enrichment object"],
+    ]
+    assert parse_query(build_third_query(["tx-1"])) == [["tx-1", "status update to completed"]]
+
+
+def test_indexed_search_matches_full_scan(corpus):
+    logs, truth = corpus
+    mock = MockDataPrime(logs)
+    tenant = truth[0][3]
+    seqnos = sorted({t[1] for t in truth})[:30]
+    query = build_second_query(tenant, seqnos)
+    expected = [lg for i, lg in enumerate(logs)
+                if any(all(_contains_term(mock._texts[i], t) for t in terms) for terms in parse_query(query))]
+    found = mock.search(query, *WINDOW)
+    assert found == expected
+    assert found
+    assert all(tenant in json.dumps(lg) for lg in found)
+
+
+def test_seqno_terms_do_not_match_longer_seqnos():
+    mock = MockDataPrime([_log('{"seqno":42}'), _log('{"seqno":"42"}'), _log('{"seqno":420}')])
+    assert mock.search("source logs | filter $d ~~ 'seqno:42'", *WINDOW) == mock.logs[:2]
+
+
+def test_search_honours_window():
+    mock = MockDataPrime([_log("hit", "2025-01-20T00:00:00Z"), _log("hit", "2025-01-21T00:00:00Z")])
+    found = mock.search("source logs | filter $d ~~ 'hit'", "2025-01-20T00:00:00Z", "2025-01-21T00:00:00Z")
+    assert found == mock.logs[:1]
+
+
+def test_row_limit_truncates_and_warns():
+    mock = MockDataPrime([_log(f"hit {i}") for i in range(25)], max_limit=10)
+    status, _, body = mock.handle(_request("source logs | filter $d ~~ 'hit'", limit=100), {})
+    lines = _lines(body)
+    assert status == 200
+    assert lines[1] == {"warning": {"resultsLimitWarning": {"limit": 10, "matched": 25}}}
+    rows = [lg for line in lines if "result" in line for lg in line["result"]["results"]]
+    assert rows == mock.logs[:10]
+
+
+def test_request_limit_below_max_limit_wins():
+    mock = MockDataPrime([_log(f"hit {i}") for i in range(25)], max_limit=20)
+    _, _, body = mock.handle(_request("source logs | filter $d ~~ 'hit'", limit=5), {})
+    rows = [lg for line in _lines(body) if "result" in line for lg in line["result"]["results"]]
+    assert len(rows) == 5
+
+
+def test_results_are_split_into_chunks():
+    mock = MockDataPrime([_log(f"hit {i}") for i in range(25)], chunk_size=10)
+    _, _, body = mock.handle(_request("source logs | filter $d ~~ 'hit'", limit=100), {})
+    chunks = [line["result"]["results"] for line in _lines(body) if "result" in line]
+    assert [len(c) for c in chunks] == [10, 10, 5]
+
+
+def test_count_stage_returns_one_row():
+    mock = MockDataPrime([_log(f"hit {i}") for i in range(25)], max_limit=10)
+    _, _, body = mock.handle(_request("source logs | filter $d ~~ 'hit' | count"), {})
+    rows = [lg for line in _lines(body) if "result" in line for lg in line["result"]["results"]]
+    assert [json.loads(r["userData"]) for r in rows] == [{"_count": 25}]
+
+
+def test_bad_query_is_400():
+    mock = MockDataPrime([])
+    status, _, _ = mock.handle(_request("source logs | limit 1"), {})
+    assert status == 400
+    assert mock.stats["status_400"] == 1
+
+
+def test_throttle_injection_returns_429_with_retry_after():
+    mock = MockDataPrime([_log("hit")], throttle_rate=1.0, seed=1)
+    status, headers, _ = mock.handle(_request("source logs | filter $d ~~ 'hit'"), {})
+    assert status == 429
+    assert headers["Retry-After"] == "1"
+    assert mock.stats["status_429"] == 1
+
+
+def test_error_injection_returns_500():
+    mock = MockDataPrime([_log("hit")], error_rate=1.0, seed=1)
+    status, _, _ = mock.handle(_request("source logs | filter $d ~~ 'hit'"), {})
+    assert status == 500
+    assert mock.stats["status_500"] == 1
+
+
+def test_fault_rates_are_seeded():
+    def statuses(seed):
+        mock = MockDataPrime([_log("hit")], throttle_rate=0.3, error_rate=0.3, seed=seed)
+        return [mock.handle(_request("source logs | filter $d ~~ 'hit'"), {})[0] for _ in range(50)]
+
+    assert statuses(3) == statuses(3)
+    assert {200, 429, 500} == set(statuses(3))
+
+
+def test_api_key_is_checked():
+    mock = MockDataPrime([], api_key="secret")
+    assert mock.handle(_request("source logs | filter $d ~~ 'x'"), {})[0] == 403
+    assert mock.handle(_request("source logs | filter $d ~~ 'x'"), {"X-API-Key": "secret"})[0] == 200
+
+
+@pytest.fixture
+def served():
+    servers = []
+
+    def serve(mock):
+        server = start_mock_server(mock)
+        servers.append(server)
+        return DataPrimeClient("secret", query_url(server))
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_merges_multi_chunk_responses(served):
+    logs = [_log(f"hit {i}") for i in range(25)]
+    client = served(MockDataPrime(logs, chunk_size=4))
+    resp = client.query("source logs | filter $d ~~ 'hit'", *WINDOW)
+    assert resp["result"]["results"] == logs
+
+
+def test_client_raises_on_injected_error(served):
+    import requests
+
+    client = served(MockDataPrime([_log("hit")], error_rate=1.0))
+    with pytest.raises(requests.HTTPError):
+        client.query("source logs | filter $d ~~ 'hit'", *WINDOW)
@@ -0,0 +1,140 @@
+import os
+import stat
+
+import pytest
+
+from seqno_checker.output import atomic_write
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_atomic_write_new_file_gets_umask_mode(tmp_path):
+    old = os.umask(0o027)
+    try:
+        with atomic_write(str(tmp_path / "out.csv")) as f:
+            f.write("x")
+    finally:
+        os.umask(old)
+    assert _mode(tmp_path / "out.csv") == 0o640
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_atomic_write_keeps_existing_mode(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("old")
+    os.chmod(path, 0o604)
+    with atomic_write(str(path)) as f:
+        f.write("new")
+    assert path.read_text() == "new"
+    assert _mode(path) == 0o604
+
+
+def test_atomic_write_failure_keeps_old_file_and_removes_temp(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write("partial")
+            raise RuntimeError("boom")
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_atomic_write_binary(tmp_path):
+    path = tmp_path / "out.bin"
+    with atomic_write(str(path), "wb") as f:
+        f.write(b"\x00\x01")
+    assert path.read_bytes() == b"\x00\x01"
+
+
+def test_atomic_write_bad_mode_removes_temp(tmp_path):
+    with pytest.raises(ValueError):
+        with atomic_write(str(tmp_path / "out.csv"), "wz"):
+            pass
+    assert os.listdir(tmp_path) == []
+
+
+def _records():
+    from seqno_checker.ids import encode_source_id, encode_txid
+    from seqno_checker.records import TxRecord
+
+    return [
+        TxRecord(100000 + i // 4, encode_txid(f"{i:08x}-87ce-43f0-ac7b-5159cc887cbc"),
+                 encode_source_id(str(455640 + i % 3) if i % 5 else "Unknown"),
+                 ("Completed", "Safe to fail", "Unknown")[i % 3])
+        for i in range(50)
+    ]
+
+
+def _rows(records):
+    from seqno_checker.records import record_to_row
+
+    return [record_to_row(rec) for rec in records]
+
+
+@pytest.mark.parametrize("txid_kind", ["uuid", "text"])
+def test_sqcol_round_trip(tmp_path, monkeypatch, txid_kind):
+    from seqno_checker import output
+    from seqno_checker.ids import encode_txid
+
+    records = _records()
+    if txid_kind == "text":
+        records[0].txid = encode_txid("not-a-uuid-é")
+    # Several row groups, including a short last one
+    monkeypatch.setattr(output, "COLUMNAR_ROW_GROUP_SIZE", 16)
+    path = str(tmp_path / "out.sqcol")
+    output.write_columnar(records, path, fmt="sqcol")
+    assert _rows(output.read_columnar(path)) == _rows(records)
+
+
+def test_sqcol_layout_is_fixed_width_little_endian(tmp_path):
+    import json
+    import struct
+
+    from seqno_checker.output import SQCOL_MAGIC, write_columnar
+
+    records = _records()
+    path = tmp_path / "out.sqcol"
+    write_columnar(records, str(path), fmt="sqcol")
+    data = path.read_bytes()
+    assert data.startswith(SQCOL_MAGIC)
+    pos = len(SQCOL_MAGIC)
+    n_rows, meta_len = struct.unpack_from("<II", data, pos)
+    meta = json.loads(data[pos + 8:pos + 8 + meta_len])
+    assert n_rows == len(records)
+    assert meta["types"] == ["i64", "u64", "u64", "u32", "u8"]
+    assert meta["lengths"] == [8 * n_rows, 8 * n_rows, 8 * n_rows, 4 * n_rows, n_rows]
+    pos += 8 + meta_len
+    seqnos = struct.unpack_from(f"<{n_rows}q", data, pos)
+    hi = struct.unpack_from(f"<{n_rows}Q", data, pos + 8 * n_rows)
+    assert list(seqnos) == [rec.seqno for rec in records]
+    assert hi[0] == records[0].txid >> 64
+
+
+def test_sqcol_group_without_types_is_an_error(tmp_path):
+    import json
+    import struct
+
+    from seqno_checker.output import SQCOL_MAGIC, read_columnar
+
+    blobs = [struct.pack("<q", 7), struct.pack("<Q", 1), struct.pack("<Q", 2), struct.pack("<I", 0),
+             struct.pack("<B", 0)]
+    meta = json.dumps({"sources": ["42"], "statuses": ["Completed"], "txid": "uuid128",
+                       "lengths": [len(b) for b in blobs]}).encode("utf-8")
+    path = tmp_path / "untyped.sqcol"
+    path.write_bytes(SQCOL_MAGIC + struct.pack("<II", 1, len(meta)) + meta + b"".join(blobs))
+    with pytest.raises(ValueError):
+        read_columnar(str(path))
+
+
+def test_sqcol_truncated_file_is_an_error(tmp_path):
+    from seqno_checker.output import read_columnar, write_columnar
+
+    path = tmp_path / "out.sqcol"
+    write_columnar(_records(), str(path), fmt="sqcol")
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(ValueError):
+        read_columnar(str(path))
@@ -0,0 +1,166 @@
+import io
+import json
+import os
+
+import pytest
+
+from seqno_checker.client import DataPrimeClient
+from seqno_checker.config import Config
+from seqno_checker.corpus import generate_logs
+from seqno_checker.timeutil import parse_datetime
+from seqno_checker.mock_server import MockDataPrime, query_url, start_mock_server
+from seqno_checker.ids import UNKNOWN_SOURCE
+from seqno_checker.output import JsonlEmitter, read_csv, write_csv
+from seqno_checker.pipeline import recheck, run
+from seqno_checker.records import CSV_FIELDNAMES, TXID_FIELD, record_to_row
+
+WINDOW = ("2025-01-19T23:00:00Z", "2025-01-20T02:00:00Z")
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    truth = []
+    logs = list(generate_logs(300, seed=11, group_size=4, sources=3, truth=truth))
+    return logs, truth
+
+
+@pytest.fixture(scope="module")
+def server(corpus):
+    server = start_mock_server(MockDataPrime(corpus[0]))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    client = DataPrimeClient("secret", query_url(server))
+    yield client
+    client.close()
+
+
+class _KilledClient(DataPrimeClient):
+    """Records each query; the `kill_at`-th one raises KeyboardInterrupt, like a ^C mid-run."""
+
+    def __init__(self, *args, kill_at=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.kill_at = kill_at
+        self.queries = []
+
+    def query(self, query, *args, **kwargs):
+        self.queries.append(query)
+        if len(self.queries) == self.kill_at:
+            raise KeyboardInterrupt
+        return super().query(query, *args, **kwargs)
+
+
+@pytest.fixture
+def params(corpus):
+    truth = corpus[1]
+    return {"tx_ids": [row[0] for row in truth[::25]], "tenant_id": truth[0][3],
+            "after_date": WINDOW[0], "before_date": WINDOW[1]}
+
+
+def _config(tmp_path):
+    return Config(batch_size=1000, concurrency=1, checkpoint_dir=str(tmp_path / "checkpoints"))
+
+
+def _rows(path):
+    return sorted([row[k] for k in CSV_FIELDNAMES] for row in map(record_to_row, read_csv(path)))
+
+
+def test_jsonl_events(tmp_path, client, params):
+    out = io.StringIO()
+    path = str(tmp_path / "out.csv")
+    run(params, client, _config(tmp_path), JsonlEmitter(out), output_path=path)
+    events = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    names = [ev["event"] for ev in events]
+    n_pairs = names.count("pair")
+    assert n_pairs == len(read_csv(path))
+    # Every pair first, then status updates, then one "done"
+    assert names == ["pair"] * n_pairs + ["status"] * (len(names) - n_pairs - 1) + ["done"]
+    assert "status" in names
+    for ev in events[:-1]:
+        assert list(ev) == ["event", *CSV_FIELDNAMES]
+
+    # The last event per txId is its final CSV row
+    final = {}
+    for ev in events[:-1]:
+        final[ev[TXID_FIELD]] = [ev[k] for k in CSV_FIELDNAMES]
+    assert sorted(final.values()) == _rows(path)
+
+    done = events[-1]
+    statuses = {}
+    for rec in read_csv(path):
+        statuses[rec.status] = statuses.get(rec.status, 0) + 1
+    assert done == {"event": "done", "rows": n_pairs, "statuses": statuses}
+
+
+# Each stage is one query here: seqnos, pairs, completed, sourceids
+@pytest.mark.parametrize("kill_at", [2, 3, 4])
+def test_interrupted_run_resumes_from_checkpoint(tmp_path, server, params, kill_at):
+    url = query_url(server)
+    whole = _KilledClient("secret", url)
+    run(params, whole, _config(tmp_path / "whole"), output_path=str(tmp_path / "whole.csv"))
+    assert len(whole.queries) == 4
+
+    path = str(tmp_path / "out.csv")
+    killed = _KilledClient("secret", url, kill_at=kill_at)
+    with pytest.raises(KeyboardInterrupt):
+        run(params, killed, _config(tmp_path), output_path=path)
+    assert not os.path.exists(path)
+
+    resumed = _KilledClient("secret", url)
+    run(params, resumed, _config(tmp_path), output_path=path)
+    # Stages finished before the kill are not queried again
+    assert resumed.queries == whole.queries[kill_at - 1:]
+    with open(path, "rb") as f, open(tmp_path / "whole.csv", "rb") as g:
+        assert f.read() == g.read()
+    assert os.listdir(tmp_path / "checkpoints") == []
+
+
+def _forget(src, dst):
+    """Copy the results at `src` to `dst` as an earlier check would have left them.
+
+    Half of the resolved groups go back to Unknown, and every third of their
+    rows also loses its sourceId.
+    """
+    records = read_csv(src)
+    groups = sorted({(rec.seqno, rec.source_id) for rec in records if rec.status == "Completed"})[::2]
+    for i, rec in enumerate(rec for rec in records if (rec.seqno, rec.source_id) in groups):
+        rec.status = "Unknown"
+        if i % 3 == 0:
+            rec.source_id = UNKNOWN_SOURCE
+    write_csv(records, dst)
+    return records
+
+
+def test_recheck_resolves_unknown_rows(tmp_path, client, params):
+    full = str(tmp_path / "full.csv")
+    run(params, client, _config(tmp_path), output_path=full)
+    path = str(tmp_path / "rechecked.csv")
+    before = _forget(full, path)
+    assert sum(rec.status == "Completed" for rec in before) < sum(rec.status == "Completed" for rec in read_csv(full))
+
+    recheck(path, client, _config(tmp_path), since=WINDOW[0])
+    assert _rows(path) == _rows(full)
+
+
+def test_recheck_window_starts_at_csv_mtime(tmp_path, client, params):
+    full = str(tmp_path / "full.csv")
+    run(params, client, _config(tmp_path), output_path=full)
+    path = str(tmp_path / "rechecked.csv")
+    before = sorted([row[k] for k in CSV_FIELDNAMES] for row in map(record_to_row, _forget(full, path)))
+
+    # Last checked an hour after the corpus ends: the window (mtime - 10 min .. now) misses every log
+    late = parse_datetime(WINDOW[1]).timestamp() + 3600
+    os.utime(path, (late, late))
+    recheck(path, client, _config(tmp_path))
+    assert _rows(path) == before
+
+    # Last checked before the corpus starts: the window covers it
+    early = parse_datetime(WINDOW[0]).timestamp()
+    os.utime(path, (early, early))
+    recheck(path, client, _config(tmp_path))
+    assert _rows(path) == _rows(full)
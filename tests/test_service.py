@@ -0,0 +1,106 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from seqno_checker import service
+from seqno_checker.config import Config
+from seqno_checker.records import TxRecord
+from seqno_checker.service import LookupService, _LookupHandler
+
+
+class _Client:
+    def for_tenant(self, tenant_id):
+        return self
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def investigate(tx_ids, tenant_id, start_date, end_date, client, *args):
+        calls.append((tx_ids, tenant_id, start_date, end_date, args))
+        return [TxRecord(1, tx_ids[0])]
+
+    monkeypatch.setattr(service, "investigate", investigate)
+    return calls
+
+
+def test_lookup_uses_config(calls):
+    config = Config(batch_size=7, concurrency=3, vectorize_min_rows=5, cache_ttl=60)
+    LookupService(_Client(), config).lookup("tx", "tenant")
+    assert calls[0][4] == (7, 3, 5)
+
+
+@pytest.mark.parametrize("after, before", [("2025-01-20T00:00:00Z", None), (None, "2025-01-20T00:00:00Z")])
+def test_lookup_rejects_half_window(calls, after, before):
+    with pytest.raises(ValueError):
+        LookupService(_Client()).lookup("tx", "tenant", after, before)
+    assert not calls
+
+
+def test_lookup_pads_given_window_and_caches(calls):
+    svc = LookupService(_Client())
+    first = svc.lookup("tx", "tenant", "2025-01-20T06:00:00Z", "2025-01-20T07:00:00Z")
+    second = svc.lookup("tx", "tenant", "2025-01-20T06:00:00Z", "2025-01-20T07:00:00Z")
+    assert (first["startDate"], first["endDate"]) == ("2025-01-20T00:00:00Z", "2025-01-20T13:00:00Z")
+    assert second["cached"] and len(calls) == 1
+
+
+def test_lookup_rechecks_cache_before_querying(calls):
+    svc = LookupService(_Client())
+    key = ("tx", "tenant", None, None)
+    cache_get = svc.cache.get
+    misses = []
+
+    def get(k):
+        if not misses:
+            # Another flight for the key finishes right after this lookup's miss
+            misses.append(k)
+            svc.cache.put(key, {"txId": "tx", "rows": []})
+            return None
+        return cache_get(k)
+
+    svc.cache.get = get
+    result = svc.lookup("tx", "tenant")
+    assert not calls
+    assert result["cached"] and result["rows"] == []
+
+
+@pytest.fixture
+def server(calls):
+    handler = type("LookupHandler", (_LookupHandler,), {"service": LookupService(_Client()),
+                                                        "log_message": lambda self, *args: None})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url) as resp:
+            return resp.status, json.load(resp)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_handler_returns_400_for_half_window(server):
+    status, body = _get(f"{server}/lookup?txId=tx&tenant=t&after=2025-01-20T00:00:00Z")
+    assert status == 400
+    assert "together" in body["error"]
+
+
+def test_handler_returns_400_for_bad_time(server):
+    status, _ = _get(f"{server}/lookup?txId=tx&tenant=t&after=yesterday&before=today")
+    assert status == 400
+
+
+def test_handler_returns_rows(server):
+    status, body = _get(f"{server}/lookup?txId=tx&tenant=t")
+    assert status == 200
+    assert body["rows"][0]["metadata.requestContext.txId"] == "tx"
@@ -0,0 +1,114 @@
+import pytest
+
+from seqno_checker.ids import UNKNOWN_SOURCE
+from seqno_checker.records import TxRecord
+from seqno_checker.status import apply_status
+
+# (seqno, txId, sourceId or None when no sourceId was found, completed) -> expected status
+CASES = {
+    "lone completed": (
+        [(1, 1, 42, True)],
+        ["Completed"],
+    ),
+    "lone pending": (
+        [(1, 1, 42, False)],
+        ["Unknown"],
+    ),
+    "sibling of a completed tx": (
+        [(1, 1, 42, True), (1, 2, 42, False), (1, 3, 42, False)],
+        ["Completed", "Safe to fail", "Safe to fail"],
+    ),
+    "same seqno, other sourceId": (
+        [(1, 1, 42, True), (1, 2, 43, False)],
+        ["Completed", "Unknown"],
+    ),
+    "same sourceId, other seqno": (
+        [(1, 1, 42, True), (2, 2, 42, False)],
+        ["Completed", "Unknown"],
+    ),
+    "completed tx next to an Unknown-sourceId tx": (
+        [(1, 1, 42, True), (1, 2, None, False)],
+        ["Completed", "Unknown"],
+    ),
+    # Unknown is compared like any other sourceId
+    "Unknown-sourceId txs share a group": (
+        [(1, 1, None, True), (1, 2, None, False), (1, 3, 42, False)],
+        ["Completed", "Safe to fail", "Unknown"],
+    ),
+    "several completed in a group": (
+        [(1, 1, 42, True), (1, 2, 42, True), (1, 3, 42, False)],
+        ["Completed", "Completed", "Safe to fail"],
+    ),
+    "txId listed twice": (
+        [(1, 1, 42, True), (1, 1, 42, True), (1, 2, 42, False)],
+        ["Completed", "Completed", "Safe to fail"],
+    ),
+    "string sourceId": (
+        [(1, 1, "web-1", True), (1, 2, "web-1", False), (1, 3, "web-2", False)],
+        ["Completed", "Safe to fail", "Unknown"],
+    ),
+    "nothing completed": (
+        [(1, 1, 42, False), (1, 2, 42, False)],
+        ["Unknown", "Unknown"],
+    ),
+}
+
+
+@pytest.mark.parametrize("rows, expected", CASES.values(), ids=CASES.keys())
+def test_status_rules(rows, expected):
+    records = [TxRecord(seqno, txid) for seqno, txid, _, _ in rows]
+    completed = [txid for _, txid, _, done in rows if done]
+    mapping = {txid: source for _, txid, source, _ in rows if source is not None}
+    apply_status(records, completed, mapping)
+    assert [rec.status for rec in records] == expected
+    for rec, (_, _, source, _) in zip(records, rows):
+        assert rec.source_id == (UNKNOWN_SOURCE if source is None else source)
+
+
+VECTORIZE_MIN_ROWS = 64
+
+
+def _mixed_records(n):
+    """Groups of up to 5 txIds with int, string and Unknown sourceIds, some with several completed."""
+    records, mapping, completed = [], {}, []
+    for i in range(n):
+        txid = 0x1e95933d87ce43f0ac7b5159cc887cbc + i
+        records.append(TxRecord(1000 + i // 5, txid))
+        kind = i % 7
+        if kind < 3:
+            mapping[txid] = 455640 + kind
+        elif kind < 5:
+            mapping[txid] = f"web-{kind}"
+        if i % 3 == 0 or i % 11 == 0:
+            completed.append(txid)
+    return records, completed, mapping
+
+
+@pytest.mark.parametrize("n", [0, 1, VECTORIZE_MIN_ROWS - 1, VECTORIZE_MIN_ROWS, VECTORIZE_MIN_ROWS + 1, 1000])
+def test_numpy_and_python_paths_agree(monkeypatch, n):
+    pytest.importorskip("numpy")
+    from seqno_checker import status
+
+    used = []
+
+    def spy(name):
+        engine = getattr(status, name)
+
+        def wrapper(records, completed_set):
+            used.append(name)
+            engine(records, completed_set)
+        return wrapper
+
+    for name in ("_apply_status_python", "_apply_status_numpy"):
+        monkeypatch.setattr(status, name, spy(name))
+
+    results = {}
+    for path, min_rows in (("python", n + 1), ("numpy", 0), ("auto", VECTORIZE_MIN_ROWS)):
+        records, completed, mapping = _mixed_records(n)
+        apply_status(records, completed, mapping, vectorize_min_rows=min_rows)
+        results[path] = [(rec.seqno, rec.txid, rec.source_id, rec.status) for rec in records]
+    expected_auto = "_apply_status_numpy" if n >= VECTORIZE_MIN_ROWS else "_apply_status_python"
+    assert used == ["_apply_status_python", "_apply_status_numpy", expected_auto]
+    assert results["numpy"] == results["python"] == results["auto"]
+    if n >= VECTORIZE_MIN_ROWS - 1:
+        assert {rec[3] for rec in results["python"]} == {"Completed", "Safe to fail", "Unknown"}
@@ -0,0 +1,115 @@
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from seqno_checker.client import DataPrimeClient
+from seqno_checker.corpus import generate_logs
+from seqno_checker.ids import UNKNOWN_SOURCE, decode_txid, encode_source_id, encode_txid
+from seqno_checker.mock_server import MockDataPrime, query_url, start_mock_server
+from seqno_checker.output import JsonlEmitter
+from seqno_checker.records import TxRecord
+from seqno_checker.timeutil import format_utc
+from seqno_checker.watch import WATCH_RETENTION, WatchState, poll_once
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def serve(logs):
+        server = start_mock_server(MockDataPrime(logs))
+        servers.append(server)
+        return DataPrimeClient("secret", query_url(server))
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _late_member(truth):
+    """A txId that isn't completed but shares its (seqno, sourceId) group with one that is."""
+    completed_groups = {(seq, src) for _, seq, src, _, done in truth if done}
+    return next(tx for tx, seq, src, _, done in truth if not done and (seq, src) in completed_groups)
+
+
+def test_poll_once_twice(serve):
+    start = datetime.now(timezone.utc) - timedelta(minutes=1)
+    truth = []
+    logs = list(generate_logs(40, seed=3, group_size=4, sources=2, start=format_utc(start),
+                              span=timedelta(seconds=30), truth=truth))
+    tenant = truth[0][3]
+    late = _late_member(truth)
+    early_logs = [lg for lg in logs if late not in json.dumps(lg)]
+
+    out = io.StringIO()
+    emitter = JsonlEmitter(out)
+    state = WatchState(start - timedelta(minutes=5))
+    first_watermark = state.watermark
+    resolved1 = poll_once(state, tenant, serve(early_logs), batch_size=100, concurrency=1, emitter=emitter)
+    assert state.watermark > first_watermark
+    assert resolved1 and all(rec.status != "Unknown" for rec in resolved1)
+    assert encode_txid(late) not in state.pending
+
+    # The late sibling is ingested after the first poll, stamped inside the overlap it re-queries
+    stamp = format_utc(state.watermark - timedelta(seconds=30))
+    late_logs = [dict(lg, timestamp=stamp) for lg in logs if late in json.dumps(lg)]
+    second_watermark = state.watermark
+    resolved2 = poll_once(state, tenant, serve(early_logs + late_logs), batch_size=100, concurrency=1,
+                          emitter=emitter)
+    assert state.watermark > second_watermark
+    # Its completed sibling was resolved (and dropped from pending) in the first poll
+    assert [(decode_txid(rec.txid), rec.status) for rec in resolved2] == [(late, "Safe to fail")]
+
+    pairs = [json.loads(line)["metadata.requestContext.txId"] for line in out.getvalue().splitlines()
+             if json.loads(line)["event"] == "pair"]
+    assert len(pairs) == len(set(pairs))
+    assert pairs[-1] == late
+    assert not {rec.txid for rec in resolved1} & {rec.txid for rec in resolved2}
+
+
+def test_expire_drops_entries_older_than_retention():
+    now = 1_800_000_000.0
+    old, recent = now - WATCH_RETENTION.total_seconds() - 1, now - 60
+    state = WatchState(datetime.fromtimestamp(now, timezone.utc))
+    for txid, seen in ((1, old), (2, recent)):
+        state.pending[txid] = TxRecord(10, txid)
+        state.first_seen[txid] = seen
+        state.resolved[txid + 10] = seen
+        state.completed_groups[(txid, 42)] = seen
+
+    expired = state.expire(now)
+    assert [rec.txid for rec in expired] == [1]
+    assert list(state.pending) == list(state.first_seen) == [2]
+    assert list(state.resolved) == [12]
+    assert list(state.completed_groups) == [(2, 42)]
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "watch.json")
+    state = WatchState(datetime(2025, 1, 20, 6, 30, tzinfo=timezone.utc))
+    for rec, seen in ((TxRecord(100, encode_txid("1e95933d-87ce-43f0-ac7b-5159cc887cbc"), 455647), 1.5),
+                      (TxRecord(101, encode_txid("not-a-uuid"), encode_source_id("web-1")), 2.5),
+                      (TxRecord(102, encode_txid("00000000-0000-0000-0000-000000000002")), 3.5)):
+        state.pending[rec.txid] = rec
+        state.first_seen[rec.txid] = seen
+    state.completed_groups = {(100, 455647): 4.5, (103, UNKNOWN_SOURCE): 5.5}
+    state.resolved = {encode_txid("ffffffff-ffff-ffff-ffff-ffffffffffff"): 6.5, encode_txid("tx-7"): 7.5}
+    state.save(path)
+
+    loaded = WatchState.load(path, datetime(2000, 1, 1, tzinfo=timezone.utc))
+    assert loaded.watermark == state.watermark
+    assert {k: (r.seqno, r.txid, r.source_id, r.status) for k, r in loaded.pending.items()} == \
+        {k: (r.seqno, r.txid, r.source_id, r.status) for k, r in state.pending.items()}
+    assert loaded.first_seen == state.first_seen
+    assert loaded.completed_groups == state.completed_groups
+    assert loaded.resolved == state.resolved
+
+
+def test_load_without_state_file_starts_at_watermark(tmp_path):
+    start = datetime(2025, 1, 20, tzinfo=timezone.utc)
+    state = WatchState.load(str(tmp_path / "missing.json"), start)
+    assert state.watermark == start
+    assert not state.pending and not state.resolved and not state.completed_groups